@@ -1,9 +1,14 @@
-import pygame
-from pygame.sprite import Sprite
+import assets
+from compact_sprite import CompactSprite
 
-class Alien(Sprite):
+class Alien(CompactSprite):
     """A class to represent a single alien in the fleet."""
 
+    # Every alien looks the same, and the assets manager hands each one the
+    # same loaded image.
+    image_path = 'images/alien.bmp'
+    __slots__ = ('ai_settings', 'screen', 'image', 'rect')
+
     def __init__(self, ai_settings, screen):
         """Initialize the alien and set its starting position."""
         super().__init__()
@@ -11,7 +16,7 @@ class Alien(Sprite):
         self.ai_settings = ai_settings
 
         # Load the alien image and set its rect attribute.
-        self.image = pygame.image.load('images/alien.bmp')
+        self.image = assets.manager.load_image(self.image_path)
         self.rect = self.image.get_rect()
 
         # Start each new alien near the top left of the screen.
@@ -22,26 +27,10 @@ class Alien(Sprite):
         # since rect.x refers to the leftmost x value of alien and rect.y 
         # refers to the topmost y value of alien.
 
-        # Store the alien's exact position
-        self.x = float(self.rect.x)
-
-    def blitme(self):
-        """Draw the alien at its current location."""
-        self.screen.blit(self.image, self.rect)
-    
-    def update(self):
-        """Move the alien right or left."""
-        self.x += (self.ai_settings.alien_speed_factor *
-                   self.ai_settings.fleet_direction)
-        self.rect.x = self.x
-    
-    def check_edges(self):
-        """Return True if alien is at edge of screen."""
-        screen_rect = self.screen.get_rect()
-        if self.rect.right >= screen_rect.right:
-            return True
-        elif self.rect.left <= 0:
-            return True
+# The fleet doesn't keep an Alien for every alien anymore. Fleet makes one
+# Alien and uses its image and rect size for the whole fleet, and moves,
+# checks the edges of and draws all the aliens at once. See fleet.py. So
+# Alien no longer keeps an exact x of its own or draws itself.
 
 # Now, that we managed to create a class for aliens, let's figure out how to
 # make a fleet of aliens.
@@ -1,46 +1,189 @@
+import atexit
+from time import perf_counter
+
+# Taken before importing pygame, so the startup report counts the imports.
+STARTED = perf_counter()
+
 import pygame
-from pygame.sprite import Group
 
-from settings import Settings
 from game_stats import GameStats
 from button import Button
 from ship import Ship
 from scoreboard import Scoreboard
+from timestep import FixedTimestep
+from renderer import DirtyRenderer
+from display import Display
+from controls import Controls, block_unused_events
+from profiler import FrameProfiler, ProfilerOverlay, StartupTimer
+from replay import Recorder, state_hash
+from fleet import Fleet
+from projectiles import Projectiles
+from stats_store import StatsStore
+from telemetry import TelemetryExporter
 import game_functions as gf
+import assets
+import text_cache
+import config
 
 def run_game():
-    # Initialize pygame, settings, and screen object.
-    pygame.init()
-    ai_settings = Settings()
-    screen = pygame.display.set_mode(
-        (ai_settings.screen_width, ai_settings.screen_height))
+    startup = StartupTimer(STARTED)
+    startup.mark('imports')
+    # Read the images from disk while everything else starts up.
+    assets.manager.preload_async(assets.IMAGE_PATHS)
+
+    # Start from settings.py, then apply the config file and environment.
+    config_path = config.find_config_path()
+    ai_settings = config.load_settings(config_path)
+    watcher = config.ConfigWatcher(config_path) if config_path else None
+    # Open the saved stats in the background while the window opens.
+    store = None
+    if ai_settings.stats_path:
+        store = StatsStore(ai_settings.stats_path)
+    startup.mark('settings')
+
+    # Initialize only the parts of pygame we use. pygame.init() would also
+    # start sound, joysticks and more that the game never touches.
+    pygame.display.init()
+    pygame.font.init()
+    startup.mark('init pygame')
+    # The game draws on a fixed-size screen that the display scales to fit
+    # the window.
+    display = Display(ai_settings)
+    screen = display.screen
+    # Now there's a display format, convert the images read so far to it.
+    assets.manager.convert_all()
     pygame.display.set_caption("Alien Invasion")
+    # Turn key presses into actions, and keep every other kind of event,
+    # like mouse motion, off the queue.
+    controls = Controls(ai_settings.key_bindings)
+    block_unused_events()
+    startup.mark('open window')
+
+    # Show the Play screen before building the rest of the game.
+    play_button = Button(ai_settings, screen, "Play")
+    # The renderer only redraws the parts of the screen that change.
+    renderer = DirtyRenderer(screen, ai_settings.bg_color, display)
+    renderer.begin_frame()
+    renderer.add(play_button.draw_button())
+    renderer.end_frame()
+    startup.mark('first frame')
+    first_frame = startup.total()
 
     # Create an instance to store game statistics and create a scoreboard.
     stats = GameStats(ai_settings)
+    if store:
+        stats.high_score = store.high_score()
     sb = Scoreboard(ai_settings, screen, stats)
     # Make a ship
     ship = Ship(ai_settings, screen)
-    # Make a group to store bullets in.
-    bullets = Group()
-    aliens = Group()
+    # Make somewhere to store bullets in.
+    bullets = Projectiles(ai_settings, screen)
+    aliens = Fleet(ai_settings, screen)
     # Make a fleet of aliens.
     gf.create_fleet(ai_settings, screen, ship, aliens)
-    # Make the Play button.
-    play_button = Button(ai_settings, screen, "Play")
+    # The ship and fleet needed the images, so they're converted by now.
+    startup.mark('build game')
+
+    # The clock decides how many fixed-length ticks each frame simulates.
+    clock = FixedTimestep(ai_settings.ticks_per_second, ai_settings.max_fps)
+
+    # Time every phase of the loop, and draw the times when asked to.
+    profiler = FrameProfiler(ai_settings.profile)
+    overlay = ProfilerOverlay(profiler, screen, text_cache.get_cache(None, 24))
+    if ai_settings.profile_trace_path:
+        atexit.register(profiler.dump, ai_settings.profile_trace_path)
+
+    # Record every tick's input so the game can be replayed exactly.
+    recorder = None
+    if ai_settings.record_path:
+        recorder = Recorder(ai_settings.record_path,
+                            ai_settings.ticks_per_second)
+        atexit.register(recorder.close)
+
+    if store:
+        atexit.register(finish_session, ai_settings, stats, profiler, store)
+
+    # Serve live stats for monitoring, from threads of their own.
+    telemetry = None
+    if ai_settings.telemetry_port is not None:
+        try:
+            telemetry = TelemetryExporter(ai_settings.telemetry_host,
+                                          ai_settings.telemetry_port,
+                                          ai_settings.telemetry_interval)
+        except OSError as e:
+            print("Not serving telemetry: {}".format(e))
+        else:
+            atexit.register(telemetry.close)
+    startup.mark('profiler, recorder, store and telemetry')
+
+    if first_frame > ai_settings.first_frame_budget:
+        print("The first frame took {:.0f} ms, over the {:.0f} ms budget."
+              .format(first_frame * 1000,
+                      ai_settings.first_frame_budget * 1000))
+        ai_settings.startup_report = True
+    if ai_settings.startup_report:
+        for line in startup.report_lines():
+            print(line)
 
     # Start the main loop for the game.
     while True:
-        gf.check_events(ai_settings, screen, stats, sb, play_button, ship, 
-            aliens, bullets)
-        if stats.game_active:
-            ship.update()
-            gf.update_bullets(ai_settings, screen, stats, sb, ship, aliens, 
-                              bullets)
-            gf.update_aliens(ai_settings, screen, stats, sb, ship, aliens, 
-                             bullets)
-        gf.update_screen(ai_settings, screen, stats, sb, ship, aliens, bullets,
-                         play_button)
+        profiler.begin_frame()
+        if watcher:
+            changes = watcher.poll()
+            if changes:
+                reload_settings(ai_settings, changes, sb, renderer, clock)
+                # A reload changes how the game plays, so replays need it.
+                if recorder:
+                    recorder.record_settings(changes)
+        with profiler.phase('check_events'):
+            events = display.map_events(pygame.event.get())
+            if recorder:
+                recorder.record_events(events)
+            input_state = gf.check_events(ai_settings, screen, stats, sb,
+                                          play_button, ship, aliens, bullets,
+                                          controls, events)
+            if input_state.repaint:
+                renderer.invalidate()
+        # Time spent waiting for the next frame, so it isn't mistaken for work.
+        with profiler.phase('wait'):
+            ticks = clock.advance()
+        game_active = stats.game_active
+        for tick in range(ticks):
+            gf.update_game(ai_settings, screen, stats, sb, ship, aliens,
+                           bullets, profiler)
+            if recorder:
+                recorder.end_tick(state_hash(ai_settings, stats, ship, aliens,
+                                             bullets))
+        if store and game_active and not stats.game_active:
+            store.record_game(ai_settings, stats)
+        with profiler.phase('update_screen'):
+            gf.update_screen(ai_settings, screen, stats, sb, ship, aliens,
+                             bullets, play_button, renderer, clock.alpha,
+                             overlay)
+        profiler.end_frame()
+        if telemetry:
+            telemetry.publish(stats, profiler, aliens, bullets)
+
+def reload_settings(ai_settings, changes, sb, renderer, clock):
+    """Put changed settings into the running game."""
+    config.apply(ai_settings, changes)
+    if 'bg_color' in changes:
+        renderer.set_background(ai_settings.bg_color)
+        # The scoreboard's text is drawn on the background color.
+        sb.prep_score()
+        sb.prep_high_score()
+        sb.prep_level()
+    if 'max_fps' in changes:
+        clock.max_fps = ai_settings.max_fps
+    print("Reloaded {}".format(', '.join(sorted(changes))))
+
+def finish_session(ai_settings, stats, profiler, store):
+    """Save the game in progress and this session's frame times."""
+    if stats.game_active and stats.ticks_played:
+        store.record_game(ai_settings, stats)
+    if profiler.enabled:
+        store.record_session(profiler)
+    store.close()
 
 run_game()
 
@@ -130,4 +273,13 @@ run_game()
 # because we don't want to remove items from a list or group within a for loop.
 # To accomplish this task, we use the copy method and a conditional to remove
 # the escaping bullets. We iterate over a copy of the list to ensure safety
-# success of code, but we still remove elements from the actual bullets list.
\ No newline at end of file
+# success of code, but we still remove elements from the actual bullets list.
+# update_bullets() doesn't copy anything anymore. The bullets aren't a group
+# of sprites at all now but rows in a few NumPy arrays, so moving them is a
+# couple of array additions and cull() finds the escaping ones with a single
+# comparison. See projectiles.py.
+
+# With telemetry_port set, the end of each frame also hands the scoreboard,
+# frame times and entity counts to telemetry.py. That's a clock check most
+# frames and never a wait, so something scraping the numbers can't slow the
+# game down. See telemetry.py.
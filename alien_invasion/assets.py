@@ -0,0 +1,102 @@
+import threading
+
+import pygame
+
+class AssetManager():
+    """A process-wide cache that loads each image from disk only once."""
+
+    def __init__(self):
+        """Initialize an empty cache and its hit/miss counters."""
+        self.images = {}
+        self.hits = 0
+        self.misses = 0
+        # Images read by a background thread that haven't been asked for yet,
+        # and the thread itself while it's still running.
+        self.loaded = {}
+        self.loader = None
+
+    def load_image(self, path):
+        """Return the shared surface for path, loading it on first use."""
+        image = self.images.get(path)
+        if image is not None:
+            self.hits += 1
+            return image
+
+        self.misses += 1
+        image = self.take_loaded(path)
+        if image is None:
+            image = pygame.image.load(path)
+        # Converting to the display's pixel format makes every later blit
+        # a straight copy. This needs a display mode, so images loaded
+        # before set_mode() stay unconverted until convert_all() is called.
+        if pygame.display.get_surface() is not None:
+            image = image.convert()
+        self.images[path] = image
+        return image
+
+    def preload(self, paths):
+        """Load every image in paths so later lookups never touch disk."""
+        for path in paths:
+            self.load_image(path)
+
+    def preload_async(self, paths):
+        """Start reading every image in paths on a background thread."""
+        def read_all():
+            for path in paths:
+                self.loaded[path] = pygame.image.load(path)
+        self.loader = threading.Thread(target=read_all, name='asset-loader',
+                                       daemon=True)
+        self.loader.start()
+
+    def take_loaded(self, path):
+        """Return path's image if the background thread read it, else None."""
+        if self.loader is not None:
+            self.loader.join()
+            self.loader = None
+        return self.loaded.pop(path, None)
+
+    def convert_all(self):
+        """
+        Convert every cached image, and any the background thread read, to
+        the current display format.
+        """
+        if self.loader is not None:
+            self.loader.join()
+            self.loader = None
+        self.images.update(self.loaded)
+        self.loaded.clear()
+        for path, image in self.images.items():
+            self.images[path] = image.convert()
+
+    def clear(self):
+        """Drop every cached surface and reset the counters."""
+        self.images.clear()
+        self.loaded.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """Return a dictionary describing how well the cache is doing."""
+        return {'images': len(self.images), 'hits': self.hits,
+                'misses': self.misses}
+
+# Every image the game needs. run_game() starts reading these before the
+# display exists, and converts them with convert_all() as soon as it does,
+# so spawning a fleet never waits on the disk.
+IMAGE_PATHS = ('images/alien.bmp', 'images/ship.bmp')
+
+# The one shared instance. Import this module and call
+# assets.manager.load_image() instead of pygame.image.load().
+manager = AssetManager()
+
+# Surfaces are never modified after loading, which is why it's safe for all
+# the aliens in a fleet to share the very same image. If you ever need to
+# draw on an image, copy() it first so the cached one stays clean.
+
+# At startup, preload_async() reads the images from disk on another thread
+# while the main thread opens the window. Converting has to wait until the
+# window exists, and SDL wants that done on the main thread, so the images
+# stay unconverted in self.loaded until run_game() calls convert_all()
+# right after opening the window. That files them in the cache converted,
+# along with anything loaded earlier. Any image load_image() reads after
+# that is converted as it's loaded.
@@ -0,0 +1,142 @@
+import argparse
+import ast
+import itertools
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+
+from settings import Settings
+import headless
+import config
+
+def parse_param(text):
+    """Turn 'name=1,2,3' into ('name', [1, 2, 3])."""
+    name, sep, values = text.partition('=')
+    if not sep or not values:
+        raise argparse.ArgumentTypeError(
+            "expected name=value[,value...], got {!r}".format(text))
+    defaults = Settings()
+    try:
+        return name, [config.validate(name, ast.literal_eval(value), defaults)
+                      for value in values.split(',')]
+    except (ValueError, SyntaxError) as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def make_jobs(params, games, seed, policy, max_ticks):
+    """Return one job for every game of every combination of params."""
+    names = [name for name, values in params]
+    jobs = []
+    for combination in itertools.product(*(values for name, values in params)):
+        overrides = dict(zip(names, combination))
+        for game_number in range(games):
+            jobs.append({'overrides': overrides, 'seed': seed + game_number,
+                         'policy': policy, 'max_ticks': max_ticks})
+    return jobs
+
+def play(job):
+    """Play the game described by job and return its summary."""
+    ai_settings = Settings()
+    config.apply(ai_settings, job['overrides'])
+    result = headless.run_headless_game(ai_settings,
+        headless.POLICIES[job['policy']], job['max_ticks'], job['seed'])
+    result['overrides'] = job['overrides']
+    return result
+
+def run_batch(jobs, processes=None):
+    """Yield each job's result as soon as any worker finishes it."""
+    # Start fresh interpreters rather than forking this one, so workers don't
+    # inherit SDL or NumPy thread state from the parent.
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(processes) as pool:
+        # One job at a time per worker keeps results streaming back evenly.
+        for result in pool.imap_unordered(play, jobs, chunksize=1):
+            yield result
+
+def summarize(results):
+    """Return score, level and survival statistics for each combination."""
+    groups = {}
+    for result in results:
+        key = json.dumps(result['overrides'], sort_keys=True)
+        groups.setdefault(key, []).append(result)
+
+    summaries = []
+    for key, group in sorted(groups.items()):
+        scores = [result['score'] for result in group]
+        levels = [result['level'] for result in group]
+        ticks = [result['ticks'] for result in group]
+        summaries.append({
+            'overrides': json.loads(key),
+            'games': len(group),
+            'score_mean': statistics.mean(scores),
+            'score_median': statistics.median(scores),
+            'score_max': max(scores),
+            'level_mean': statistics.mean(levels),
+            'level_max': max(levels),
+            'survival_ticks_mean': statistics.mean(ticks),
+            'game_over_rate': sum(result['game_over'] for result in group) /
+                len(group),
+        })
+    return summaries
+
+def main():
+    """Run a parameter sweep from the command line."""
+    parser = argparse.ArgumentParser(
+        description="Play many headless games in parallel, sweeping settings.")
+    parser.add_argument('--param', type=parse_param, action='append',
+                        default=[], metavar='NAME=V1,V2,...',
+                        help="a setting to sweep; repeat for a grid")
+    parser.add_argument('--games', type=int, default=10,
+                        help="games per combination of settings")
+    parser.add_argument('--processes', type=int, default=os.cpu_count())
+    parser.add_argument('--max-ticks', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--policy', choices=sorted(headless.POLICIES),
+                        default='random')
+    parser.add_argument('--out', metavar='PATH',
+                        help="append every game's result to PATH as JSON lines")
+    args = parser.parse_args()
+
+    jobs = make_jobs(args.param, args.games, args.seed, args.policy,
+                     args.max_ticks)
+    out = open(args.out, 'a') if args.out else None
+    results = []
+    start = time.perf_counter()
+    try:
+        for result in run_batch(jobs, args.processes):
+            results.append(result)
+            if out:
+                out.write(json.dumps(result) + '\n')
+                out.flush()
+            print("\r{}/{} games".format(len(results), len(jobs)), end='',
+                  file=sys.stderr)
+    finally:
+        if out:
+            out.close()
+    elapsed = time.perf_counter() - start
+    print(file=sys.stderr)
+
+    for summary in summarize(results):
+        print(json.dumps(summary))
+    print("{} games in {:.1f}s on {} processes ({:.0f} games/min)".format(
+        len(results), elapsed, args.processes, len(results) / elapsed * 60),
+        file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
+
+# Every game is independent, so the way to play more of them is to play
+# them in more processes at once. multiprocessing.Pool starts one worker
+# per core, and each worker sets up its own headless pygame the first time
+# it plays. Separate processes don't share the GIL, so four cores really do
+# play four games at a time.
+
+# imap_unordered() hands results back in whatever order they finish, so
+# we can write each one to disk right away. If an overnight sweep dies
+# halfway, the games it finished are still in the --out file.
+
+# For example, to sweep two settings over a 3x2 grid, 50 games each:
+#   python batch.py --param speedup_scale=1.05,1.1,1.2 \
+#       --param bullets_allowed=3,5 --games 50 --out sweep.jsonl
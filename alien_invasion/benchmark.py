@@ -0,0 +1,391 @@
+import argparse
+import json
+import math
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from settings import Settings
+from alien import Alien
+from game_stats import GameStats
+from button import Button
+from ship import Ship
+from scoreboard import Scoreboard
+from renderer import DirtyRenderer
+from fleet import Fleet
+from projectiles import Projectiles
+from headless import init_headless
+import game_functions as gf
+
+class BenchmarkGame():
+    """A game set up with a chosen screen size, fleet size and bullets."""
+
+    def __init__(self, resolution, aliens, bullets):
+        """Build every game object, then swap in the requested fleet."""
+        self.ai_settings = Settings()
+        self.ai_settings.screen_width, self.ai_settings.screen_height = (
+            resolution)
+        self.ai_settings.bullets_allowed = bullets
+        self.ai_settings.respawn_pause = 0
+        self.screen = init_headless(self.ai_settings)
+
+        self.stats = GameStats(self.ai_settings)
+        self.sb = Scoreboard(self.ai_settings, self.screen, self.stats)
+        self.ship = Ship(self.ai_settings, self.screen)
+        self.bullets = Projectiles(self.ai_settings, self.screen)
+        self.aliens = Fleet(self.ai_settings, self.screen)
+        self.play_button = Button(self.ai_settings, self.screen, "Play")
+        self.renderer = DirtyRenderer(self.screen, self.ai_settings.bg_color)
+        gf.start_game(self.ai_settings, self.screen, self.stats, self.sb,
+                      self.ship, self.aliens, self.bullets)
+
+        self.alien_count = aliens
+        self.bullet_count = bullets
+        self.spawn_fleet()
+        self.fill_bullets()
+
+    def spawn_fleet(self):
+        """Pack alien_count aliens into the top half of the screen."""
+        screen_rect = self.screen.get_rect()
+        columns = max(1, int(math.sqrt(self.alien_count * 2)))
+        rows = math.ceil(self.alien_count / columns)
+        step_x = max(1, (screen_rect.width - 2 * self.aliens.alien_width)
+                     // columns)
+        step_y = max(1, (screen_rect.height // 2) // rows)
+        index = np.arange(self.alien_count)
+        self.aliens.spawn(self.aliens.alien_width + index % columns * step_x,
+                          index // columns * step_y)
+
+    def restore_fleet(self):
+        """Bring back every alien that was shot, in its old place."""
+        if len(self.aliens.x) != self.alien_count:
+            # The fleet was cleared and the game built a new one.
+            self.spawn_fleet()
+        elif len(self.aliens) < self.alien_count:
+            self.aliens.revive(np.flatnonzero(~self.aliens.alive))
+        self.aliens.offset_y = 0
+
+    def fill_bullets(self):
+        """Fire until there are bullet_count bullets below the fleet."""
+        screen_rect = self.screen.get_rect()
+        while len(self.bullets) < self.bullet_count:
+            # Spread the bullets out in the bottom half so they don't hit.
+            number = len(self.bullets) + 1
+            self.bullets.fire(number * 37 % screen_rect.width,
+                              screen_rect.bottom - number * 11 %
+                              (screen_rect.height // 2),
+                              -self.ai_settings.bullet_speed_factor)
+
+    def fill_bullets_in_fleet(self):
+        """Fire until there are bullet_count bullets among the fleet's rows."""
+        screen_rect = self.screen.get_rect()
+        top = self.aliens.get_rect().top
+        band = max(1, self.aliens.bottom() - self.ai_settings.bullet_height -
+                   top)
+        while len(self.bullets) < self.bullet_count:
+            # Spread the bullets out between the fleet's top and bottom, so
+            # none of them can be skipped for being below it.
+            number = len(self.bullets) + 1
+            self.bullets.fire(number * 37 % screen_rect.width,
+                              top + number * 11 % band,
+                              -self.ai_settings.bullet_speed_factor)
+
+def bench_create_fleet(game):
+    def run():
+        game.aliens.empty()
+        gf.create_fleet(game.ai_settings, game.screen, game.ship, game.aliens)
+    return run
+
+def bench_update_aliens(game):
+    def run():
+        gf.update_aliens(game.ai_settings, game.screen, game.stats, game.sb,
+                         game.ship, game.aliens, game.bullets)
+        # Keep the fleet from reaching the ship and being replaced.
+        game.aliens.offset_y = 0
+    return run
+
+def bench_update_bullets(game):
+    def run():
+        gf.update_bullets(game.ai_settings, game.screen, game.stats, game.sb,
+                          game.ship, game.aliens, game.bullets)
+        game.fill_bullets()
+    return run
+
+def bench_check_bullet_alien_collisions(game):
+    # The bullets sit among the fleet's rows, so every one of them goes
+    # through the grid lookups, and some hit. Put the shot aliens and the
+    # used bullets back before each call so the case keeps its size.
+    def run():
+        gf.check_bullet_alien_collisions(game.ai_settings, game.screen,
+            game.stats, game.sb, game.ship, game.aliens, game.bullets)
+    def setup():
+        game.restore_fleet()
+        game.bullets.empty()
+        game.fill_bullets_in_fleet()
+    return run, setup
+
+def bench_update_alien_bullets(game):
+    # The fleet fires every tick until bullet_count of its bullets are in
+    # the air, and the ship sits below the screen so none of them hit it.
+    game.ai_settings.alien_bullets_allowed = game.bullet_count
+    game.ai_settings.alien_fire_interval = 0
+    game.ship.rect.top = game.screen.get_rect().bottom
+    def run():
+        gf.update_alien_bullets(game.ai_settings, game.screen, game.stats,
+                                game.sb, game.ship, game.aliens, game.bullets)
+    return run
+
+def bench_fleet_lookups(game):
+    # The same bullets, but nothing is killed, so this times just the grid
+    # lookups and overlap checks for every bullet.
+    game.bullets.empty()
+    game.fill_bullets_in_fleet()
+    def run():
+        game.aliens.groupcollide(game.bullets, False, False)
+    return run
+
+def bench_scoreboard_prep(game):
+    def run():
+        game.stats.score += 50
+        game.sb.prep_score()
+        game.sb.render_score()
+        game.sb.prep_high_score()
+        game.sb.prep_level()
+        game.sb.prep_ships()
+    return run
+
+def bench_update_screen(game):
+    game.ship.moving_right = True
+    def run():
+        game.ship.update()
+        # Bounce off the edges as the game does, but stay at the top so the
+        # fleet is always on the screen.
+        gf.check_fleet_edges(game.ai_settings, game.aliens)
+        game.aliens.update()
+        game.aliens.offset_y = 0
+        gf.update_screen(game.ai_settings, game.screen, game.stats, game.sb,
+                         game.ship, game.aliens, game.bullets,
+                         game.play_button, game.renderer)
+    return run
+
+def bench_update_game(game):
+    def run():
+        gf.update_game(game.ai_settings, game.screen, game.stats, game.sb,
+                       game.ship, game.aliens, game.bullets)
+    def setup():
+        # Bullets reach the fleet and kill aliens every tick, so put the
+        # fleet and bullets back first or the case stops being the size
+        # it's named for.
+        game.restore_fleet()
+        game.fill_bullets()
+    return run, setup
+
+# Each benchmark, and which of the parameters actually affect it. A
+# benchmark returns the function to time, or (function, setup) when
+# something has to be put back before each call without being timed.
+BENCHMARKS = [
+    ('create_fleet', bench_create_fleet, ('resolution',)),
+    ('update_aliens', bench_update_aliens, ('aliens',)),
+    ('update_bullets', bench_update_bullets, ('bullets',)),
+    ('check_bullet_alien_collisions', bench_check_bullet_alien_collisions,
+        ('aliens', 'bullets')),
+    ('fleet_lookups', bench_fleet_lookups, ('aliens', 'bullets')),
+    ('update_alien_bullets', bench_update_alien_bullets,
+        ('aliens', 'bullets')),
+    ('scoreboard_prep', bench_scoreboard_prep, ()),
+    ('update_screen', bench_update_screen,
+        ('resolution', 'aliens', 'bullets')),
+    ('update_game', bench_update_game, ('aliens', 'bullets')),
+]
+
+PARAMETERS = {
+    'resolution': [(1200, 800), (640, 480), (1920, 1080)],
+    'aliens': [50, 500, 5000],
+    'bullets': [3, 100, 1000],
+}
+
+QUICK_PARAMETERS = {
+    'resolution': [(1200, 800)],
+    'aliens': [50, 2000],
+    'bullets': [3, 300],
+}
+
+def cases(parameters, name_filter=None):
+    """Yield (key, bench, resolution, aliens, bullets) for every case."""
+    for name, bench, varies in BENCHMARKS:
+        if name_filter and name_filter not in name:
+            continue
+        resolutions = parameters['resolution'] if 'resolution' in varies \
+            else parameters['resolution'][:1]
+        alien_counts = parameters['aliens'] if 'aliens' in varies \
+            else parameters['aliens'][:1]
+        bullet_counts = parameters['bullets'] if 'bullets' in varies \
+            else parameters['bullets'][:1]
+        for resolution in resolutions:
+            for aliens in alien_counts:
+                for bullets in bullet_counts:
+                    key = "{}[{}x{},aliens={},bullets={}]".format(
+                        name, resolution[0], resolution[1], aliens, bullets)
+                    yield key, bench, resolution, aliens, bullets
+
+def bytes_per_entity(make, count):
+    """Return how much memory each of count calls to make() holds on to."""
+    # The first call loads images and warms caches, which every later
+    # entity shares, so it isn't counted.
+    kept = [make()]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept.extend(make() for number in range(count))
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used / count
+
+def memory_report(count=10000):
+    """Print how many bytes a bullet, a ship and an alien take up."""
+    game = BenchmarkGame((1200, 800), 50, 3)
+    game.bullets.empty()
+
+    def make_bullet():
+        # The arrays double in size as they fill up, so this averages out
+        # to what the bullets really need, plus the spare room.
+        game.bullets.fire(game.ship.rect.centerx, game.ship.rect.top,
+                          -game.ai_settings.bullet_speed_factor)
+
+    def make_fleet_alien():
+        # Each call makes a fleet of 1000, so this is 1000 aliens' worth.
+        fleet = Fleet(game.ai_settings, game.screen)
+        index = np.arange(1000)
+        fleet.spawn(index % 40 * fleet.alien_width,
+                    index // 40 * fleet.alien_height)
+        return fleet
+
+    for name, make, scale in (
+            ('bullet', make_bullet, 1),
+            ('ship', lambda: Ship(game.ai_settings, game.screen), 1),
+            ('alien sprite', lambda: Alien(game.ai_settings, game.screen), 1),
+            ('alien in a fleet', make_fleet_alien, 1000)):
+        per_entity = bytes_per_entity(make, max(1, count // scale)) / scale
+        print("{:<70} {:>10,.0f} bytes".format(name, per_entity))
+
+def measure(run, min_time, setup=None):
+    """
+    Return how many times per second run() can be called. setup(), if
+    given, is called before every run() and isn't timed.
+    """
+    # Warm up caches and let arrays grow before timing anything.
+    for warmup in range(10):
+        if setup:
+            setup()
+        run()
+    if setup:
+        return measure_with_setup(run, min_time, setup)
+    calls = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time:
+        for repeat in range(10):
+            run()
+        calls += 10
+        elapsed = time.perf_counter() - start
+    return calls / elapsed
+
+def measure_with_setup(run, min_time, setup):
+    """Return how many times per second run() can be called after setup()."""
+    calls = 0
+    elapsed = 0.0
+    while elapsed < min_time:
+        setup()
+        start = time.perf_counter()
+        run()
+        elapsed += time.perf_counter() - start
+        calls += 1
+    return calls / elapsed
+
+def current_commit():
+    """Return the checked-out git commit, or None outside a repository."""
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'],
+            stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    """Run the benchmarks and compare them against a saved baseline."""
+    parser = argparse.ArgumentParser(
+        description="Measure how fast the parts of Alien Invasion run.")
+    parser.add_argument('--quick', action='store_true',
+                        help="run a smaller set of sizes")
+    parser.add_argument('--filter', help="only run benchmarks containing this")
+    parser.add_argument('--min-time', type=float, default=0.5,
+                        help="seconds to spend on each case")
+    parser.add_argument('--save', metavar='PATH',
+                        help="write the results to PATH as a baseline")
+    parser.add_argument('--compare', metavar='PATH',
+                        help="compare the results against the baseline at PATH")
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help="slowdown that counts as a regression (0.15 = 15%%)")
+    parser.add_argument('--memory', action='store_true',
+                        help="report the memory each entity uses instead")
+    args = parser.parse_args()
+
+    if args.memory:
+        memory_report()
+        return
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+
+    parameters = QUICK_PARAMETERS if args.quick else PARAMETERS
+    results = {}
+    regressions = []
+    for key, bench, resolution, aliens, bullets in cases(parameters,
+                                                        args.filter):
+        game = BenchmarkGame(resolution, aliens, bullets)
+        run = bench(game)
+        setup = None
+        if isinstance(run, tuple):
+            run, setup = run
+        per_second = measure(run, args.min_time, setup)
+        results[key] = per_second
+
+        line = "{:<70} {:>12,.0f}/s".format(key, per_second)
+        if baseline and key in baseline:
+            change = per_second / baseline[key] - 1
+            line += "  {:+.1%}".format(change)
+            if change < -args.threshold:
+                line += "  REGRESSION"
+                regressions.append(key)
+        print(line)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'commit': current_commit(), 'results': results}, f,
+                      indent=2, sort_keys=True)
+    if regressions:
+        print("{} case(s) slower than the baseline by more than {:.0%}."
+              .format(len(regressions), args.threshold))
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
+
+# Every number here is calls per second, so for the per-tick and per-frame
+# functions it's how many ticks or frames per second that part alone could
+# keep up with. Bigger is better.
+
+# Run "python benchmark.py --save baseline.json" on a commit you trust, then
+# "python benchmark.py --compare baseline.json" after making changes. Any
+# case that got slower by more than the threshold is flagged, and the exit
+# status is 1 so a script can catch it. Baselines are only comparable on the
+# same machine, so they aren't kept in the repository.
+
+# "python benchmark.py --memory" reports bytes per entity instead: how much
+# memory ten thousand more bullets, ships or aliens actually hold on to,
+# measured with tracemalloc. Shared things like images aren't counted, and
+# a fleet alien is a fleet of a thousand divided by a thousand, so it
+# includes the fleet's arrays and spatial hash too.
@@ -1,4 +1,6 @@
-import pygame.font
+import pygame
+
+import text_cache
 
 class Button():
     
@@ -11,7 +13,7 @@ class Button():
         self.width, self.height = 200, 50
         self.button_color = (0, 255, 0)
         self.text_color = (255, 255, 255)
-        self.font = pygame.font.SysFont(None, 48)
+        self.text = text_cache.get_cache(None, 48)
 
         # Build the button's rect object and center it.
         self.rect = pygame.Rect(0, 0, self.width, self.height)
@@ -25,6 +27,9 @@ class Button():
 # green and the text to be white. We prepare a font attribute for
 # rendering text. The None argument tells Pygame to use the default font, and 48
 # is the size of the font.
+# The font lives in a shared TextCache now (see text_cache.py), so the button
+# and the scoreboard load it once between them, and "Play" is only rendered
+# the first time it's asked for.
 
 # Pygame works with text by rendering the string you want to display as an
 # image. This is where we make a new method called prep_msg() to handle this
@@ -32,7 +37,7 @@ class Button():
 
     def prep_msg(self, msg):
         """Turn msg into a rendered image and center text on the button."""
-        self.msg_image = self.font.render(msg, True, self.text_color,
+        self.msg_image = self.text.render(msg, self.text_color,
             self.button_color)
         self.msg_image_rect = self.msg_image.get_rect()
         self.msg_image_rect.center = self.rect.center
@@ -46,9 +51,11 @@ class Button():
 # the font with a transparent background
 
     def draw_button(self):
+        """Draw the button and return the rect it covers."""
         # Draw blank button and then draw message.
-        self.screen.fill(self.button_color, self.rect)
-        self.screen.blit(self.msg_image, self.msg_image_rect)
+        button_rect = self.screen.fill(self.button_color, self.rect)
+        msg_rect = self.screen.blit(self.msg_image, self.msg_image_rect)
+        return button_rect.union(msg_rect)
 
 # screen.fill() draws the rectangular portion of the button. screen.blit()
 # draws the text image to the screen
\ No newline at end of file
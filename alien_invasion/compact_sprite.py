@@ -0,0 +1,56 @@
+class CompactSprite():
+    """A sprite with no __dict__ that pygame's sprite groups can still hold."""
+
+    # Subclasses list the attributes they use in their own __slots__.
+    __slots__ = ('memberships',)
+
+    def __init__(self):
+        """Start out in no groups."""
+        self.memberships = ()
+
+    def add_internal(self, group):
+        """Remember that group holds this sprite."""
+        self.memberships += (group,)
+
+    def remove_internal(self, group):
+        """Forget that group held this sprite."""
+        self.memberships = tuple(member for member in self.memberships
+                                 if member is not group)
+
+    def groups(self):
+        """Return a list of the groups that hold this sprite."""
+        return list(self.memberships)
+
+    def alive(self):
+        """Return True if any group holds this sprite."""
+        return bool(self.memberships)
+
+    def kill(self):
+        """Remove the sprite from every group that holds it."""
+        for group in self.memberships:
+            group.remove_internal(self)
+        self.memberships = ()
+
+    def update(self, *args, **kwargs):
+        """Do nothing; subclasses move themselves here."""
+
+# pygame's Sprite keeps its attributes in a per-instance __dict__ and the
+# groups it's in in a per-instance set, and each of those costs a couple of
+# hundred bytes before the sprite stores anything at all. Subclasses of
+# Sprite always get a __dict__, so __slots__ on them doesn't help.
+
+# CompactSprite implements the few methods sprite groups actually call
+# (add_internal(), remove_internal() and kill()) without inheriting from
+# Sprite. A group takes anything that isn't a Sprite and can't be iterated
+# as a single sprite, so Group.add(), remove(), empty() and draw() all still
+# work. That's pygame's AbstractGroup.add() falling back to the old-style
+# sprite protocol when iterating the object fails, not a documented
+# interface, so if a pygame upgrade breaks Scoreboard's Group of ships,
+# look there first. A sprite is almost always in one group at most, so a tuple is
+# plenty to keep track of them, and the empty tuple every new sprite starts
+# with is shared by all of them.
+
+# With __slots__ each instance is a fixed-size block with a pointer per
+# attribute. Anything that's the same for every sprite of a kind belongs on
+# the class instead; see the slot lists in ship.py and alien.py, and
+# "python benchmark.py --memory" for what each kind of sprite costs.
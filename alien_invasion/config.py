@@ -0,0 +1,270 @@
+import ast
+import json
+import os
+import time
+
+try:
+    import tomllib
+except ImportError:
+    # Python 3.10 and older only read JSON config files.
+    tomllib = None
+
+from settings import Settings, DYNAMIC_SETTINGS
+import waves
+from display import SCALE_MODES
+
+# Environment variables starting with this override the config file, e.g.
+# ALIEN_INVASION_BULLETS_ALLOWED=5. ALIEN_INVASION_CONFIG names the file.
+ENV_PREFIX = 'ALIEN_INVASION_'
+CONFIG_VARIABLE = ENV_PREFIX + 'CONFIG'
+DEFAULT_PATHS = ('settings.toml', 'settings.json')
+
+# Settings that can change while the game is running. Anything else in the
+# file only takes effect the next time the game starts.
+TUNABLES = ('ship_speed_factor', 'bullet_speed_factor', 'alien_speed_factor',
+            'speedup_scale', 'score_scale', 'bullets_allowed',
+            'bullet_width', 'bullet_height', 'bullet_color',
+            'fleet_drop_speed', 'bg_color', 'max_fps', 'show_profiler',
+            'alien_bullets_allowed', 'alien_fire_interval',
+            'alien_bullet_speed_factor', 'alien_bullet_width',
+            'alien_bullet_height', 'alien_bullet_color')
+SPEED_FACTORS = ('ship_speed_factor', 'bullet_speed_factor',
+                 'alien_speed_factor', 'alien_bullet_speed_factor')
+# Settings that can only be one of a few strings.
+CHOICES = {'scale_mode': SCALE_MODES}
+# Whole numbers that are None until they're set.
+OPTIONAL_SIZES = ('window_width', 'window_height', 'telemetry_port')
+# Settings that have to be more than zero, not just zero or more.
+POSITIVE = ('screen_width', 'screen_height', 'ticks_per_second',
+            'bullet_width', 'bullet_height', 'bullets_allowed', 'speedup_scale',
+            'score_scale', 'alien_scale', 'window_width', 'window_height',
+            'alien_fire_interval', 'alien_bullet_width',
+            'alien_bullet_height', 'telemetry_interval')
+
+class ConfigError(ValueError):
+    """A config file or environment variable has a setting we can't use."""
+
+def find_config_path(environ=os.environ):
+    """Return the config file to load, or None if there isn't one."""
+    if environ.get(CONFIG_VARIABLE):
+        return environ[CONFIG_VARIABLE]
+    for path in DEFAULT_PATHS:
+        if os.path.exists(path):
+            return path
+    return None
+
+def read_file(path):
+    """Return the settings in the TOML or JSON file at path."""
+    if path.endswith('.toml'):
+        if tomllib is None:
+            raise ConfigError("{}: reading TOML needs Python 3.11".format(path))
+        with open(path, 'rb') as f:
+            try:
+                return tomllib.load(f)
+            except tomllib.TOMLDecodeError as e:
+                raise ConfigError("{}: {}".format(path, e))
+    with open(path) as f:
+        try:
+            values = json.load(f)
+        except ValueError as e:
+            raise ConfigError("{}: {}".format(path, e))
+    if not isinstance(values, dict):
+        raise ConfigError("{}: expected an object of settings".format(path))
+    return values
+
+def read_environ(environ=os.environ):
+    """Return the settings given as ALIEN_INVASION_* variables."""
+    values = {}
+    for variable, text in environ.items():
+        if not variable.startswith(ENV_PREFIX) or variable == CONFIG_VARIABLE:
+            continue
+        try:
+            value = ast.literal_eval(text)
+        except (ValueError, SyntaxError):
+            # Anything that isn't a Python literal is taken as a string.
+            value = text
+        values[variable[len(ENV_PREFIX):].lower()] = value
+    return values
+
+def validate(name, value, defaults=None):
+    """Return value checked and converted for the setting name."""
+    if defaults is None:
+        defaults = Settings()
+    if name == 'dynamic_overrides' or not hasattr(defaults, name):
+        raise ConfigError("no setting called {}".format(name))
+    default = getattr(defaults, name)
+
+    if isinstance(default, bool):
+        if not isinstance(value, bool):
+            raise ConfigError("{} must be true or false".format(name))
+    elif isinstance(default, int):
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise ConfigError("{} must be a whole number".format(name))
+    elif isinstance(default, float):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ConfigError("{} must be a number".format(name))
+        value = float(value)
+    elif name in OPTIONAL_SIZES:
+        if value is not None and (isinstance(value, bool) or
+                                  not isinstance(value, int)):
+            raise ConfigError("{} must be a whole number".format(name))
+    elif name in CHOICES:
+        if value not in CHOICES[name]:
+            raise ConfigError("{} must be one of {}".format(
+                name, ', '.join(CHOICES[name])))
+    elif name == 'wave_patterns':
+        if isinstance(value, str):
+            value = [value]
+        if (not isinstance(value, (list, tuple)) or not value or
+                not all(pattern in waves.PATTERNS for pattern in value)):
+            raise ConfigError("wave_patterns must be a list of {}".format(
+                ', '.join(sorted(waves.PATTERNS))))
+        value = tuple(value)
+    elif name == 'key_bindings':
+        # Only the actions given change; the rest keep their keys.
+        if not isinstance(value, dict):
+            raise ConfigError("key_bindings must map actions to key names")
+        bindings = dict(default)
+        for action, names in value.items():
+            if action not in default:
+                raise ConfigError("key_bindings: no action called {}; use "
+                                  "one of {}".format(action, ', '.join(default)))
+            if isinstance(names, str):
+                names = [names]
+            if (not isinstance(names, (list, tuple)) or
+                    not all(isinstance(key, str) for key in names)):
+                raise ConfigError("key_bindings: {} must be a list of key "
+                                  "names".format(action))
+            bindings[action] = tuple(names)
+        value = bindings
+    elif isinstance(default, tuple):
+        if (not isinstance(value, (list, tuple)) or len(value) != 3 or
+                not all(isinstance(part, int) and 0 <= part <= 255
+                        for part in value)):
+            raise ConfigError("{} must be three numbers from 0 to 255"
+                              .format(name))
+        value = tuple(value)
+    elif value is not None and not isinstance(value, str):
+        # Paths, which default to None or a file name.
+        raise ConfigError("{} must be a path".format(name))
+
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        if name == 'fleet_direction':
+            if value not in (1, -1):
+                raise ConfigError("fleet_direction must be 1 or -1")
+        elif name == 'telemetry_port' and value > 65535:
+            raise ConfigError("telemetry_port can't be over 65535")
+        elif value < 0 or (value == 0 and name in POSITIVE):
+            raise ConfigError("{} can't be {}".format(name, value))
+    return value
+
+def load_values(path=None, environ=os.environ):
+    """Return the validated settings from path, then the environment."""
+    values = read_file(path) if path else {}
+    values.update(read_environ(environ))
+    defaults = Settings()
+    return {name: validate(name, value, defaults)
+            for name, value in values.items()}
+
+def apply(ai_settings, values):
+    """Put validated values into ai_settings, even in the middle of a game."""
+    defaults = Settings()
+    for name, value in values.items():
+        if name not in DYNAMIC_SETTINGS:
+            setattr(ai_settings, name, value)
+            continue
+        start = ai_settings.dynamic_overrides.get(name,
+                                                  getattr(defaults, name))
+        ai_settings.dynamic_overrides[name] = value
+        if name in SPEED_FACTORS and start:
+            # Keep however much the game has sped up since the level began.
+            setattr(ai_settings, name,
+                    getattr(ai_settings, name) * value / start)
+        else:
+            setattr(ai_settings, name, value)
+
+def load_settings(path=None, environ=os.environ):
+    """Return a Settings with the config file and environment applied."""
+    ai_settings = Settings()
+    apply(ai_settings, load_values(path, environ))
+    return ai_settings
+
+class ConfigWatcher():
+    """Notice when the config file changes and work out what changed."""
+
+    def __init__(self, path, environ=os.environ, interval=0.5):
+        """Start watching path, which has already been loaded."""
+        self.path = path
+        self.environ = environ
+        self.interval = interval
+        self.values = load_values(path, environ)
+        self.mtime = self.modified_time()
+        self.next_check = time.monotonic() + interval
+
+    def modified_time(self):
+        """Return when the file was last changed, or None if it's gone."""
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def poll(self):
+        """Return the tunables that changed since the last call, if any."""
+        now = time.monotonic()
+        if now < self.next_check:
+            return {}
+        self.next_check = now + self.interval
+        mtime = self.modified_time()
+        if mtime is None or mtime == self.mtime:
+            return {}
+        self.mtime = mtime
+
+        try:
+            values = load_values(self.path, self.environ)
+        except (ConfigError, OSError) as e:
+            # Half-saved files are common while someone is editing; keep
+            # playing with the old settings and try again on the next save.
+            print("Not reloading settings: {}".format(e))
+            return {}
+        changed = {name: value for name, value in values.items()
+                   if self.values.get(name) != value}
+        # A setting taken out of the file goes back to its default.
+        defaults = Settings()
+        for name in self.values:
+            if name not in values:
+                changed[name] = getattr(defaults, name)
+        self.values = values
+        for name in changed:
+            if name not in TUNABLES:
+                print("{} will change the next time the game starts"
+                      .format(name))
+        return {name: value for name, value in changed.items()
+                if name in TUNABLES}
+
+# Settings still come from settings.py, but a settings.toml or
+# settings.json file next to the game can change any of them, and so can
+# environment variables like ALIEN_INVASION_SCREEN_WIDTH=1920. Every value
+# is checked against the type of the setting it replaces, so a typo stops
+# the game at startup with a clear message instead of a strange crash
+# later on.
+
+# A file like this makes the aliens start faster and allows more bullets:
+#   {"alien_speed_factor": 0.5, "bullets_allowed": 10, "bg_color": [0, 0, 0]}
+
+# While the game runs, the main loop asks the watcher every frame whether
+# the file changed. The watcher only actually looks at the file twice a
+# second, and only rereads it when its modification time moves, so it costs
+# next to nothing. Settings in TUNABLES go straight into the running game;
+# things like the screen size have to wait for a restart.
+
+# Deleting a line from the file counts as a change too: the setting goes
+# back to the value settings.py gives it, so the running game always
+# matches what the file says.
+
+# key_bindings is the one setting that's a table. Only the actions a file
+# lists get new keys, and whether each key name exists is checked when
+# controls.py builds its lookup table.
+
+# The speed factors grow every level, so reloading one keeps the level's
+# speed-up: doubling alien_speed_factor in the file doubles the aliens'
+# current speed, whatever level the game is on.
@@ -0,0 +1,119 @@
+import pygame
+
+from config import ConfigError
+
+# The only events the game reads. Everything else, mouse motion above all,
+# is dropped by SDL before it reaches the queue.
+INPUT_EVENTS = (pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP,
+                pygame.MOUSEBUTTONDOWN)
+
+# Window events after which the window's contents may be gone, so the whole
+# screen has to be drawn again rather than just the parts that changed.
+REPAINT_EVENTS = (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED,
+                  pygame.WINDOWSHOWN, pygame.WINDOWRESTORED,
+                  pygame.WINDOWMAXIMIZED)
+
+# Actions that last as long as their key is held down. Every other action
+# happens once, when its key is pressed.
+HELD_ACTIONS = ('move_left', 'move_right')
+
+def block_unused_events():
+    """Let only INPUT_EVENTS and REPAINT_EVENTS onto pygame's event queue."""
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed(INPUT_EVENTS + REPAINT_EVENTS)
+
+class InputState():
+    """What the player did before one frame's ticks, and is still doing."""
+
+    def __init__(self, held, presses, repaint=False):
+        """
+        Store the held actions, the (action, event) presses, and whether
+        the window needs repainting.
+        """
+        # Actions whose keys are down once all the frame's events are in.
+        self.held = held
+        # Actions started this frame, in the order they happened. 'click'
+        # is a mouse press; its event has the position.
+        self.presses = presses
+        # True if the window was uncovered or restored this frame.
+        self.repaint = repaint
+
+    def holding(self, action):
+        """Return True if a key for action is down."""
+        return action in self.held
+
+class Controls():
+    """Turn pygame events into actions, using the configured key bindings."""
+
+    def __init__(self, key_bindings):
+        """Build the dispatch table from key_bindings."""
+        # (event type, key) -> action, so each event costs one lookup.
+        self.dispatch = {(pygame.QUIT, None): 'quit',
+                         (pygame.MOUSEBUTTONDOWN, None): 'click'}
+        self.keys_for = {}
+        for action, names in key_bindings.items():
+            keys = []
+            for name in names:
+                try:
+                    key = pygame.key.key_code(name)
+                except ValueError:
+                    raise ConfigError("key_bindings: no key called {!r} for {}"
+                                      .format(name, action))
+                self.dispatch[(pygame.KEYDOWN, key)] = action
+                if action in HELD_ACTIONS:
+                    self.dispatch[(pygame.KEYUP, key)] = action
+                keys.append(key)
+            self.keys_for[action] = keys
+        # Keys down right now, so releasing one of two keys bound to the
+        # same action doesn't stop it.
+        self.keys_down = set()
+        self.held = frozenset()
+
+    def read(self, events):
+        """Return the InputState after events."""
+        presses = []
+        changed = False
+        repaint = False
+        dispatch = self.dispatch
+        for event in events:
+            action = dispatch.get((event.type, getattr(event, 'key', None)))
+            if action is None:
+                if event.type in REPAINT_EVENTS:
+                    repaint = True
+                continue
+            if event.type == pygame.KEYUP:
+                self.keys_down.discard(event.key)
+                changed = True
+            elif action in HELD_ACTIONS:
+                self.keys_down.add(event.key)
+                changed = True
+            else:
+                presses.append((action, event))
+        if changed:
+            self.held = frozenset(
+                action for action in HELD_ACTIONS
+                if any(key in self.keys_down for key in self.keys_for.get(
+                    action, ())))
+        return InputState(self.held, presses, repaint)
+
+# Before this, every event pygame produced went through a chain of ifs,
+# including the hundreds of MOUSEMOTION events a moving mouse makes, and
+# a key press went through another chain to find out what it did. Now
+# block_unused_events() stops SDL from queueing anything the game doesn't
+# read, and the rest are looked up by (type, key) in one dictionary.
+
+# The window events in REPAINT_EVENTS get through too. The renderer only
+# updates the parts of the window that changed, so when another window
+# covered the game, or it comes back from being minimized, the rest would
+# stay blank. The InputState says so with repaint, and the main loop has
+# the renderer draw the whole screen on the next frame.
+
+# The keys come from key_bindings in settings.py, by the names
+# pygame.key.name() gives them, so a config file can add WASD like this:
+#   key_bindings = {move_left = ["left", "a"], move_right = ["right", "d"]}
+
+# Each frame gets an InputState: which held actions are held, and the
+# one-off actions in the order they were pressed. game_functions.py turns
+# it into ship movement and everything else. Controls remembers which keys
+# are down between frames, so a frame with no events is just the same
+# state over again.
@@ -0,0 +1,144 @@
+import pygame
+
+# 'scaled' has SDL scale the picture on the GPU (pygame.SCALED). 'integer'
+# scales by whole numbers only, so every game pixel stays a neat square.
+# 'fast' and 'smooth' stretch the picture to fit the window in software.
+SCALE_MODES = ('scaled', 'integer', 'fast', 'smooth')
+
+# The only events that carry a position the game cares about.
+MOUSE_EVENTS = (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP,
+                pygame.MOUSEMOTION)
+
+def fit(logical_size, window_size, whole_numbers=False):
+    """Return the largest rect of the right shape centered in the window."""
+    logical_width, logical_height = logical_size
+    window_width, window_height = window_size
+    scale = min(window_width / logical_width, window_height / logical_height)
+    if whole_numbers and scale >= 1:
+        scale = int(scale)
+    width = round(logical_width * scale)
+    height = round(logical_height * scale)
+    return pygame.Rect((window_width - width) // 2,
+                       (window_height - height) // 2, width, height)
+
+class Display():
+    """The window, and the fixed-size surface the game draws on."""
+
+    def __init__(self, ai_settings):
+        """Open the window and make the surface the game will draw on."""
+        logical_size = (ai_settings.screen_width, ai_settings.screen_height)
+        window_size = (ai_settings.window_width or logical_size[0],
+                       ai_settings.window_height or logical_size[1])
+        self.scale_mode = ai_settings.scale_mode
+        flags = pygame.FULLSCREEN if ai_settings.fullscreen else 0
+
+        if window_size == logical_size and not ai_settings.fullscreen:
+            # Nothing to scale, so draw straight onto the window.
+            if ai_settings.vsync:
+                # Pygame only honours vsync on scaled or OpenGL displays.
+                self.window = pygame.display.set_mode(
+                    logical_size, pygame.SCALED, vsync=1)
+            else:
+                self.window = pygame.display.set_mode(logical_size)
+            self.screen = self.window
+        elif self.scale_mode == 'scaled':
+            # SDL picks the window size itself: the biggest whole multiple of
+            # the game's size that fits, or the whole display in fullscreen.
+            self.window = pygame.display.set_mode(
+                logical_size, flags | pygame.SCALED,
+                vsync=1 if ai_settings.vsync else 0)
+            self.screen = self.window
+        else:
+            if ai_settings.fullscreen:
+                # (0, 0) asks for the display's own resolution.
+                window_size = (0, 0)
+            self.window = pygame.display.set_mode(window_size, flags)
+            self.screen = pygame.Surface(logical_size).convert()
+            self.window.fill((0, 0, 0))
+
+        self.dest = fit(logical_size, self.window.get_size(),
+                        self.scale_mode == 'integer')
+        # Only set for software scaling, where we have to copy each frame.
+        self.window_area = None
+        if self.screen is not self.window:
+            self.window_area = self.window.subsurface(self.dest)
+
+    def flip(self):
+        """Show the whole of the game's surface in the window."""
+        if self.window_area is not None:
+            self.scale_onto_window()
+        pygame.display.flip()
+
+    def update(self, rects):
+        """Show the parts of the game's surface covered by rects."""
+        if self.window_area is None:
+            pygame.display.update(rects)
+            return
+        if (self.scale_mode != 'integer' or
+                self.dest.width % self.screen.get_width()):
+            # Stretching by a fraction can't be done one rect at a time
+            # without seams at the rects' edges, so scale the whole frame.
+            self.flip()
+            return
+
+        scale = self.dest.width // self.screen.get_width()
+        screen_rect = self.screen.get_rect()
+        window_rects = []
+        for rect in rects:
+            rect = pygame.Rect(rect).clip(screen_rect)
+            if not rect:
+                continue
+            window_rect = pygame.Rect(self.dest.x + rect.x * scale,
+                                      self.dest.y + rect.y * scale,
+                                      rect.width * scale, rect.height * scale)
+            pygame.transform.scale(self.screen.subsurface(rect),
+                                   window_rect.size,
+                                   self.window.subsurface(window_rect))
+            window_rects.append(window_rect)
+        pygame.display.update(window_rects)
+
+    def scale_onto_window(self):
+        """Scale the game's whole surface into its place in the window."""
+        if self.scale_mode == 'smooth':
+            pygame.transform.smoothscale(self.screen, self.dest.size,
+                                         self.window_area)
+        else:
+            pygame.transform.scale(self.screen, self.dest.size,
+                                   self.window_area)
+
+    def to_logical(self, pos):
+        """Turn a position in the window into one on the game's surface."""
+        if self.window_area is None:
+            return pos
+        x, y = pos
+        return ((x - self.dest.x) * self.screen.get_width() // self.dest.width,
+                (y - self.dest.y) * self.screen.get_height() //
+                self.dest.height)
+
+    def map_events(self, events):
+        """Return events with every mouse position moved onto the surface."""
+        if self.window_area is None:
+            return events
+        mapped = []
+        for event in events:
+            if event.type in MOUSE_EVENTS:
+                attributes = dict(event.dict)
+                attributes['pos'] = self.to_logical(event.pos)
+                event = pygame.event.Event(event.type, attributes)
+            mapped.append(event)
+        return mapped
+
+# The game always draws on a surface of screen_width x screen_height, so
+# the fleet layout, the scoreboard and the button never need to know how
+# big the window really is. That also means a 4K window costs the game
+# logic nothing extra: only the final scale-up touches every window pixel.
+
+# With SCALED, SDL does that scale-up on the graphics card, and it even
+# moves mouse positions onto the game's surface for us. The software modes
+# draw the game on a separate surface and scale it into a letterboxed area
+# of the window at the end of each frame. In 'integer' mode we can still
+# scale only the rects the renderer says changed, since a whole-number
+# scale never splits a game pixel across two rects.
+
+# DirtyRenderer calls flip() and update() on a Display exactly the way it
+# calls them on pygame.display, so it doesn't care which one it has.
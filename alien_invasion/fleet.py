@@ -0,0 +1,353 @@
+import math
+
+import numpy as np
+import pygame
+
+from alien import Alien
+from projectiles import Projectiles
+from spatial_hash import SpatialHash
+
+# Fills the gaps between aliens in the pre-rendered formation so they come
+# out transparent. Nothing in the alien image is this color.
+FORMATION_COLORKEY = (255, 0, 255)
+
+class Fleet():
+    """A fleet of aliens stored as arrays instead of one sprite per alien."""
+
+    def __init__(self, ai_settings, screen, cell_size=64):
+        """Initialize an empty fleet."""
+        self.ai_settings = ai_settings
+        self.screen = screen
+        self.screen_rect = screen.get_rect()
+
+        # Every alien looks the same, so one Alien supplies the image and
+        # size for the whole fleet.
+        self.alien = Alien(ai_settings, screen)
+        self.image = self.alien.image
+        if ai_settings.alien_scale != 1:
+            width, height = self.image.get_size()
+            self.image = pygame.transform.smoothscale(self.image, (
+                max(1, round(width * ai_settings.alien_scale)),
+                max(1, round(height * ai_settings.alien_scale))))
+        self.alien_width, self.alien_height = self.image.get_size()
+
+        # Each alien's position inside the formation, and whether it's alive.
+        self.x = np.zeros(0, dtype=np.int32)
+        self.y = np.zeros(0, dtype=np.int32)
+        self.alive = np.zeros(0, dtype=bool)
+        self.count = 0
+
+        # Where the formation is on the screen. The fleet always moves as
+        # one block, so moving it only changes these two numbers.
+        self.offset_x = 0.0
+        self.offset_y = 0
+
+        # Aliens never move inside the formation, so this grid of alien
+        # indices only changes when an alien is shot.
+        self.grid = SpatialHash(cell_size)
+
+        # The living aliens drawn onto one surface, and the box around them
+        # in formation coordinates. Both stay the same until an alien dies.
+        self.formation = None
+        self.bounds = None
+
+        # Aliens that share an x make up a column. column_order lists each
+        # column's aliens from the bottom up, one column after another, and
+        # column_start and column_end say where each column's run is.
+        self.column_x = np.zeros(0, dtype=np.int32)
+        self.column_of = np.zeros(0, dtype=np.intp)
+        self.column_order = np.zeros(0, dtype=np.intp)
+        self.column_start = np.zeros(0, dtype=np.intp)
+        self.column_end = np.zeros(0, dtype=np.intp)
+        # Where each column's lowest living alien is in column_order, and
+        # that alien's index, or -1 once the column is empty. Only these
+        # aliens shoot, since anything above them would hit their own side.
+        self.shooter_position = np.zeros(0, dtype=np.intp)
+        self.shooters = np.zeros(0, dtype=np.intp)
+
+        # The fleet's own bullets, heading down at the ship, and the ticks
+        # until it fires the next one.
+        self.bullets = Projectiles(ai_settings, screen, 'alien_bullet')
+        self.fire_timer = 0
+
+    def spawn(self, x, y):
+        """Replace the fleet with living aliens at the positions x and y."""
+        self.offset_x = 0.0
+        self.offset_y = 0
+        # A new wave starts with a clear sky and a full wait before it fires.
+        self.bullets.empty()
+        self.fire_timer = self.fire_interval()
+        if np.array_equal(x, self.x) and np.array_equal(y, self.y):
+            # Same formation as last time: bring the dead back in place
+            # instead of building new arrays and a new grid.
+            self.revive(np.flatnonzero(~self.alive))
+            return
+
+        self.x = np.asarray(x, dtype=np.int32)
+        self.y = np.asarray(y, dtype=np.int32)
+        self.alive = np.zeros(len(self.x), dtype=bool)
+        self.count = 0
+        self.grid.clear()
+        self.invalidate()
+        self.find_columns()
+        self.revive(range(len(self.x)))
+
+    def find_columns(self):
+        """Group the formation's aliens into columns, lowest alien first."""
+        self.column_x, self.column_of = np.unique(self.x, return_inverse=True)
+        # Sort by column, then from the largest y (the bottom) up.
+        self.column_order = np.lexsort((-self.y, self.column_of))
+        self.column_end = np.cumsum(np.bincount(self.column_of,
+                                                minlength=len(self.column_x)))
+        self.column_start = np.concatenate(([0], self.column_end[:-1]))
+
+    def revive(self, indices):
+        """Bring the aliens at indices back to life."""
+        indices = np.asarray(indices, dtype=np.intp)
+        self.grid.insert_many(indices.tolist(), self.x[indices],
+                              self.y[indices], self.alien_width,
+                              self.alien_height)
+        self.alive[indices] = True
+        self.count = int(self.alive.sum())
+        self.invalidate()
+        self.find_shooters()
+
+    def find_shooters(self):
+        """Work out every column's lowest living alien from scratch."""
+        # Positions in column_order of the living aliens, and the first of
+        # them at or after each column's start. A sentinel past the end
+        # stands in for columns with nothing left after them.
+        living = np.append(np.flatnonzero(self.alive[self.column_order]),
+                           len(self.column_order))
+        position = living[np.searchsorted(living, self.column_start)]
+        # A column whose first living alien is in the next column is empty.
+        position = np.minimum(position, self.column_end)
+        self.shooter_position = position
+        self.shooters = np.where(
+            position < self.column_end,
+            np.append(self.column_order, -1)[position], -1)
+
+    def invalidate(self):
+        """Forget the formation image and bounds after aliens change."""
+        self.formation = None
+        self.bounds = None
+
+    def empty(self):
+        """Remove every alien, and every bullet they fired."""
+        self.alive[:] = False
+        self.count = 0
+        self.grid.clear()
+        self.invalidate()
+        self.shooter_position = self.column_end.copy()
+        self.shooters[:] = -1
+        self.bullets.empty()
+
+    def __len__(self):
+        return self.count
+
+    def screen_offset(self):
+        """Return the formation's whole-pixel position on the screen."""
+        # Round halves up, the way a Rect rounds the (always positive) x of
+        # an alien on the screen. round() would send 0.5 and 2.5 down.
+        return math.floor(self.offset_x + 0.5), self.offset_y
+
+    def update(self):
+        """Move the whole fleet right or left."""
+        self.offset_x += (self.ai_settings.alien_speed_factor *
+                          self.ai_settings.fleet_direction)
+
+    def drop(self, distance):
+        """Move the whole fleet down by distance pixels."""
+        self.offset_y += distance
+
+    def formation_bounds(self):
+        """Return the box around the living aliens in formation coordinates."""
+        if self.bounds is None:
+            if not self.count:
+                self.bounds = pygame.Rect(0, 0, 0, 0)
+            else:
+                living_x = self.x[self.alive]
+                living_y = self.y[self.alive]
+                left = int(living_x.min())
+                top = int(living_y.min())
+                self.bounds = pygame.Rect(left, top,
+                    int(living_x.max()) + self.alien_width - left,
+                    int(living_y.max()) + self.alien_height - top)
+        return self.bounds
+
+    def check_edges(self):
+        """Return True if any alien is at an edge of the screen."""
+        if not self.count:
+            return False
+        bounds = self.formation_bounds()
+        offset_x = self.screen_offset()[0]
+        return (bounds.right + offset_x >= self.screen_rect.right or
+                bounds.left + offset_x <= 0)
+
+    def bottom(self):
+        """Return the y-coordinate of the lowest alien's bottom edge."""
+        if not self.count:
+            return 0
+        return self.formation_bounds().bottom + self.offset_y
+
+    def colliding(self, rect):
+        """Return the indices of the living aliens that rect overlaps."""
+        offset_x, offset_y = self.screen_offset()
+        # Look rect up in formation coordinates, where the grid lives.
+        local_rect = rect.move(-offset_x, -offset_y)
+        hits = []
+        for index in self.grid.query(local_rect):
+            if local_rect.colliderect((int(self.x[index]), int(self.y[index]),
+                                       self.alien_width, self.alien_height)):
+                hits.append(index)
+        return hits
+
+    def collide_any(self, sprite):
+        """Return True if sprite overlaps any living alien."""
+        return bool(self.colliding(sprite.rect))
+
+    def kill(self, indices):
+        """Remove the aliens at indices from the fleet."""
+        for index in indices:
+            if self.alive[index]:
+                self.alive[index] = False
+                self.count -= 1
+                self.grid.remove(index)
+                self.invalidate()
+                column = self.column_of[index]
+                if self.shooters[column] == index:
+                    self.next_shooter(column)
+
+    def next_shooter(self, column):
+        """Move column's shooter up to the lowest alien still alive in it."""
+        position = self.shooter_position[column] + 1
+        end = self.column_end[column]
+        # Every alien is stepped over at most once per wave, so this costs
+        # next to nothing however many aliens die.
+        while position < end and not self.alive[self.column_order[position]]:
+            position += 1
+        self.shooter_position[column] = position
+        self.shooters[column] = (self.column_order[position] if position < end
+                                 else -1)
+
+    def fire_interval(self):
+        """Return the ticks between shots from the fleet."""
+        return max(1, round(self.ai_settings.alien_fire_interval *
+                            self.ai_settings.ticks_per_second))
+
+    def ready_to_fire(self):
+        """Count down one tick, and return True if it's time to shoot."""
+        self.fire_timer -= 1
+        if self.fire_timer > 0:
+            return False
+        self.fire_timer = self.fire_interval()
+        return True
+
+    def choose_shooter(self, target_x):
+        """
+        Return the index of the bottom alien in the living column closest to
+        target_x, or None if there are no aliens. Only looks at columns.
+        """
+        living = np.flatnonzero(self.shooters >= 0)
+        if not len(living):
+            return None
+        offset_x = self.screen_offset()[0]
+        centers = self.column_x[living] + offset_x + self.alien_width // 2
+        return int(self.shooters[living[np.abs(centers - target_x).argmin()]])
+
+    def fire(self, index):
+        """Fire a bullet down from the bottom center of the alien at index."""
+        offset_x, offset_y = self.screen_offset()
+        self.bullets.fire(int(self.x[index]) + offset_x + self.alien_width // 2,
+                          int(self.y[index]) + offset_y + self.alien_height,
+                          self.ai_settings.alien_bullet_speed_factor)
+
+    def groupcollide(self, bullets, dokill_bullets, dokill_aliens):
+        """
+        Work like pygame.sprite.groupcollide(bullets, aliens, ...), returning
+        a dictionary of the index of each bullet that hit to the alien
+        indices it hit.
+        """
+        collisions = {}
+        if not self.count or not len(bullets):
+            return collisions
+        # Bullets below the fleet can't hit anything, and that's most of
+        # them, so only look the rest up.
+        for index in bullets.above(self.bottom()).tolist():
+            hits = self.colliding(bullets.get_rect(index))
+            if hits:
+                collisions[index] = hits
+                # Kill as we go, like pygame does, so two bullets can't both
+                # claim the same alien. Bullets are checked oldest first.
+                if dokill_aliens:
+                    self.kill(hits)
+        if dokill_bullets and collisions:
+            bullets.kill(list(collisions))
+        return collisions
+
+    def get_rect(self):
+        """Return a rect around every living alien, in screen coordinates."""
+        if not self.count:
+            return pygame.Rect(0, 0, 0, 0)
+        return self.formation_bounds().move(self.screen_offset())
+
+    def formation_image(self):
+        """Return the living aliens drawn onto one surface, building it once."""
+        if self.formation is None:
+            bounds = self.formation_bounds()
+            formation = pygame.Surface(bounds.size)
+            if pygame.display.get_surface() is not None:
+                formation = formation.convert()
+            formation.fill(FORMATION_COLORKEY)
+            formation.set_colorkey(FORMATION_COLORKEY, pygame.RLEACCEL)
+            living = np.flatnonzero(self.alive)
+            positions = zip((self.x[living] - bounds.left).tolist(),
+                            (self.y[living] - bounds.top).tolist())
+            image = self.image
+            formation.blits([(image, position) for position in positions],
+                            doreturn=False)
+            self.formation = formation
+        return self.formation
+
+    def draw(self, surface):
+        """Draw every living alien onto surface and return their bounds."""
+        if not self.count:
+            return pygame.Rect(0, 0, 0, 0)
+        # One rect for the whole fleet is far cheaper to track than one per
+        # alien, and the gaps between aliens are only background anyway.
+        return surface.blit(self.formation_image(), self.get_rect())
+
+# Before, every alien was its own sprite with its own x, and moving the
+# fleet meant calling update() on fifty sprites. But the fleet always moves
+# together: every alien shifts by the same amount and drops by the same
+# amount. So now each alien only stores where it sits inside the formation,
+# and the fleet stores where the formation is. Moving a fleet of a thousand
+# aliens is one addition.
+
+# Questions about the whole fleet become NumPy reductions over the living
+# aliens: the leftmost and rightmost x tell us if we've hit an edge, and the
+# largest y tells us if we've reached the bottom.
+
+# The spatial hash from before still finds which aliens a bullet might hit,
+# but it's built in formation coordinates. Since aliens never move inside
+# the formation, the grid never needs refiling; we just shift each bullet's
+# rect into formation coordinates before looking it up.
+
+# Drawing used to blit every living alien every frame. But between one
+# alien dying and the next, the formation looks exactly the same; only its
+# position changes. So the fleet draws the living aliens onto one surface
+# the first time it's needed and blits that, once per frame, until kill()
+# throws it away. The gaps between aliens are filled with a colorkey so
+# bullets behind the fleet still show through, and RLEACCEL lets SDL skip
+# over those gaps quickly.
+
+# Only the lowest living alien in each column shoots back. Rather than
+# search the fleet for those aliens every time it fires, the fleet sorts
+# each column from the bottom up once per formation and keeps a pointer to
+# each column's current shooter. When kill() takes out a shooter, the
+# pointer steps up past the dead to the next living alien, so choosing who
+# fires only ever looks at one number per column.
+
+# The box around the living aliens is cached the same way, so checking the
+# edges and the bottom is a couple of additions per tick instead of a pass
+# over the whole fleet.
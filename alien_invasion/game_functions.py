@@ -1,59 +1,80 @@
 import sys
 import pygame
-from time import sleep
 
-from bullet import Bullet
-from alien import Alien
-
-def check_keydown_events(event, ai_settings, screen, stats, ship, aliens, 
-                         bullets):
-    """Respond to key presses."""
-    if event.key == pygame.K_RIGHT:
-        ship.moving_right = True
-    elif event.key == pygame.K_LEFT:
-        ship.moving_left = True
-    elif event.key == pygame.K_SPACE:
-        fire_bullet(ai_settings, screen, ship, bullets)
-    elif event.key == pygame.K_q:
-        sys.exit()
-    elif event.key == pygame.K_p:
-        start_game(ai_settings, screen, stats, ship, aliens, bullets)
+from game_stats import PLAYING, RESPAWNING, GAME_OVER
+from profiler import NULL_PROFILER
+import waves
+
+def press_fire(event, ai_settings, screen, stats, sb, play_button, ship,
+               aliens, bullets):
+    """Fire a bullet."""
+    fire_bullet(ai_settings, screen, stats, ship, bullets)
+
+def press_play(event, ai_settings, screen, stats, sb, play_button, ship,
+               aliens, bullets):
+    """Start a new game."""
+    start_game(ai_settings, screen, stats, sb, ship, aliens, bullets)
+
+def press_pause(event, ai_settings, screen, stats, sb, play_button, ship,
+                aliens, bullets):
+    """Pause the game, or carry on if it's paused."""
+    stats.toggle_pause()
+
+def press_profiler(event, ai_settings, screen, stats, sb, play_button, ship,
+                   aliens, bullets):
+    """Show or hide the frame times."""
+    ai_settings.show_profiler = not ai_settings.show_profiler
+
+def press_quit(event, ai_settings, screen, stats, sb, play_button, ship,
+               aliens, bullets):
+    """Quit the game."""
+    sys.exit()
+
+def press_click(event, ai_settings, screen, stats, sb, play_button, ship,
+                aliens, bullets):
+    """Respond to a mouse click."""
+    mouse_x, mouse_y = event.pos
+    check_play_button(ai_settings, screen, stats, sb, play_button, ship,
+                      aliens, bullets, mouse_x, mouse_y)
+
+# What each one-off action in controls.py does.
+PRESS_HANDLERS = {
+    'fire': press_fire,
+    'play': press_play,
+    'pause': press_pause,
+    'profiler': press_profiler,
+    'quit': press_quit,
+    'click': press_click,
+}
 
 # Note: Naming parameters as the same thing as your arguments helps ALOT with
 # keeping your code consistent and correct.
 
-def fire_bullet(ai_settings, screen, ship, bullets):
+def fire_bullet(ai_settings, screen, stats, ship, bullets):
     """Fire a bullet if limit not reached yet."""
-    # Create a new bullet and add it to the bullets group.
+    # Nothing fires between lives, while paused or after the game is over.
+    if stats.state != PLAYING:
+        return
+    # Add a bullet at the top center of the ship, heading straight up.
     if len(bullets) < ai_settings.bullets_allowed:
-        new_bullet = Bullet(ai_settings, screen, ship)
-        bullets.add(new_bullet)
-
-def check_keyup_events(event,ship):
-    """Respond to key releases."""
-    if event.key == pygame.K_RIGHT:
-        ship.moving_right = False
-    elif event.key == pygame.K_LEFT:
-        ship.moving_left = False
+        bullets.fire(ship.rect.centerx, ship.rect.top,
+                     -ai_settings.bullet_speed_factor)
+        stats.shots_fired += 1
 
 def check_events(ai_settings, screen, stats, sb, play_button, ship, aliens, 
-                 bullets):
-    """Respond to keypresses and mouse events."""
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            sys.exit()
-        
-        elif event.type == pygame.KEYDOWN:
-            check_keydown_events(event, ai_settings, screen, stats, ship, 
-                                 aliens, bullets)
-        
-        elif event.type == pygame.KEYUP:
-            check_keyup_events(event, ship)
-        
-        elif event.type == pygame.MOUSEBUTTONDOWN:
-            mouse_x, mouse_y = pygame.mouse.get_pos()
-            check_play_button(ai_settings, screen, stats, sb, play_button, ship, 
-                              aliens, bullets, mouse_x, mouse_y)
+                 bullets, controls, events=None):
+    """Respond to keypresses and mouse events, and return the InputState."""
+    # Take events from pygame unless we were handed some, e.g. by a replay.
+    if events is None:
+        events = pygame.event.get()
+    state = controls.read(events)
+    for action, event in state.presses:
+        PRESS_HANDLERS[action](event, ai_settings, screen, stats, sb,
+                               play_button, ship, aliens, bullets)
+    # The ship keeps moving for as long as its key is held.
+    ship.moving_right = state.holding('move_right')
+    ship.moving_left = state.holding('move_left')
+    return state
 
 def check_play_button(ai_settings, screen, stats, sb, play_button, ship, aliens, 
                       bullets, mouse_x, mouse_y):
@@ -68,7 +89,7 @@ def start_game(ai_settings, screen, stats, sb, ship, aliens, bullets):
         pygame.mouse.set_visible(False)
         # Reset the game statisttics
         stats.reset_stats()
-        stats.game_active = True
+        stats.set_state(PLAYING)
         # Reset the scoreboard images.
         sb.prep_score()
         sb.prep_high_score()
@@ -81,7 +102,7 @@ def start_game(ai_settings, screen, stats, sb, ship, aliens, bullets):
         bullets.empty()
 
         # Create a new fleet and center the ship.
-        create_fleet(ai_settings, screen, ship, aliens)
+        create_fleet(ai_settings, screen, ship, aliens, stats.level)
         ship.center_ship()
 
 # So if a mouse button is pressed down, we check if the position of the mouse
@@ -92,6 +113,8 @@ def start_game(ai_settings, screen, stats, sb, ship, aliens, bullets):
 # screen. We use the conditional to restrict it to only the button.
 # pygame.mouse.get_pos() returns a tuple containing the x- and y- coordinates
 # of the mouse cursor when the mouse button is clicked.
+# The click event carries the same position in event.pos, which is what we
+# use now, so a recorded click replays at exactly the same spot.
 
 # In larger projects, you'll often refactor code you've written before adding
 # more code. Refactoring simplifies the structure of the code you've already
@@ -106,27 +129,57 @@ def start_game(ai_settings, screen, stats, sb, ship, aliens, bullets):
 # always be clicked even when the button isn't there. Therefore, we add
 # another conditional to ensure whether the game is actually running
 
+def update_game(ai_settings, screen, stats, sb, ship, aliens, bullets,
+                profiler=NULL_PROFILER):
+    """Advance the game by one fixed-length tick."""
+    # Count down timed states, like the pause after losing a ship.
+    stats.update_state()
+    if stats.state == PLAYING:
+        stats.ticks_played += 1
+        with profiler.phase('ship.update'):
+            ship.update()
+        with profiler.phase('update_bullets'):
+            update_bullets(ai_settings, screen, stats, sb, ship, aliens,
+                           bullets)
+        with profiler.phase('check_bullet_alien_collisions'):
+            check_bullet_alien_collisions(ai_settings, screen, stats, sb, ship,
+                                          aliens, bullets)
+        with profiler.phase('update_alien_bullets'):
+            update_alien_bullets(ai_settings, screen, stats, sb, ship, aliens,
+                                 bullets)
+        # An alien bullet may just have cost a ship, and then the fleet
+        # waits out the pause like everything else.
+        if stats.state == PLAYING:
+            with profiler.phase('update_aliens'):
+                update_aliens(ai_settings, screen, stats, sb, ship, aliens,
+                              bullets)
+
 def update_screen(ai_settings, screen, stats, sb, ship, aliens, bullets,
-        play_button):
-    """Update images on the screen and flip to the new screen."""
-    # Redraw the screen during each pass through the loop.
-    screen.fill(ai_settings.bg_color)
+        play_button, renderer, alpha=1.0, overlay=None):
+    """Update images on the screen and show the parts that changed."""
+    # Erase last frame's drawing by copying the background over it.
+    renderer.begin_frame()
     # Redraw all bullets behind ship and aliens
-    for bullet in bullets.sprites():
-        bullet.draw_bullet()
+    renderer.add_all(bullets.draw(alpha))
+    renderer.add_all(aliens.bullets.draw(alpha))
     # Redraw ship
-    ship.blitme()
+    renderer.add(ship.blitme(alpha))
     # Redraw aliens
-    aliens.draw(screen)
+    renderer.add(aliens.draw(screen))
     # Draw the score information.
-    sb.show_score()
+    renderer.add_all(sb.show_score())
     # Draw the play button if the game is inactive.
     if not stats.game_active:
-        play_button.draw_button()
+        renderer.add(play_button.draw_button())
+    # Draw the frame times on top of everything if they're turned on.
+    if overlay and ai_settings.show_profiler:
+        renderer.add_all(overlay.draw())
     # Make the most recently drawn screen visible.
-    pygame.display.flip()
+    renderer.end_frame()
 
 # We have now an updated screen for seamless movement
+# The renderer only erases and updates the rects that were drawn on, instead
+# of filling and flipping the whole screen every frame. See renderer.py.
 
 # Now, let's give the player the ability to move the ship right and left
 # Whenever the player presses a key, that keypress is registered in Pygame
@@ -143,6 +196,9 @@ def update_screen(ai_settings, screen, stats, sb, ship, aliens, bullets,
 
 # The function check_events seems to be too long, so we're gonna split it
 # into 2 (actually 3).
+# (These days controls.py looks each event up in a table instead, and
+# PRESS_HANDLERS says what each action does, so there's no chain of ifs to
+# split up anymore.)
 
 # So now we put the bullet update. To everything together for bullets, we
 # import the Bullet class and make an instance of it called new_bullet
@@ -155,6 +211,8 @@ def update_screen(ai_settings, screen, stats, sb, ship, aliens, bullets,
 # In the update_screen function, it now pulls out every element in the bullets
 # list (which is a bullet) and calls their draw_bullet method since they're
 # class 
+# (The bullets aren't sprites anymore. They live in arrays, and
+# bullets.draw() draws them all at once; see projectiles.py.)
 
 # Now, you must be wondering how do these bullets move. Let's look at 
 # alien_invasion.py. 
@@ -176,23 +234,21 @@ def update_bullets(ai_settings, screen, stats, sb, ship, aliens, bullets):
     """Update position of bullets and get rid of old bullets."""
     # Update bullet positions.
     bullets.update()
-    # Get rid of bullets that have disappeared.
-    for bullet in bullets.copy():
-        if bullet.rect.bottom <= 0:
-            bullets.remove(bullet)
-    
-    check_bullet_alien_collisions(ai_settings, screen, stats, sb, ship, aliens, 
-                                  bullets)
+    # Get rid of bullets that have disappeared off the screen.
+    bullets.cull()
+    # update_game() checks for collisions right after this, as its own step,
+    # so the profiler can time the two separately.
 
 def check_bullet_alien_collisions(ai_settings, screen, stats, sb, ship, aliens, 
                                   bullets):
     """Respond to bullet-alien collsion."""
     # Remove any bullets and aliens that have collided.
-    collisions = pygame.sprite.groupcollide(bullets, aliens, True, True)
+    collisions = aliens.groupcollide(bullets, True, True)
     if collisions:
-        for aliens in collisions.values():
-            stats.score += ai_settings.alien_points * len(aliens)
-            sb.prep_score()
+        stats.hits += len(collisions)
+        for aliens_hit in collisions.values():
+            stats.score += ai_settings.alien_points * len(aliens_hit)
+        sb.prep_score()
         check_high_score(stats, sb)
 
     if len(aliens) == 0:
@@ -205,7 +261,7 @@ def check_bullet_alien_collisions(ai_settings, screen, stats, sb, ship, aliens,
         stats.level += 1
         sb.prep_level()
 
-        create_fleet(ai_settings, screen, ship, aliens)
+        create_fleet(ai_settings, screen, ship, aliens, stats.level)
 
 # Remember when groupcollide returns a dictionary? Each key in the dictionary
 # is the first group's sprites or in this example, bullets while each value is
@@ -226,58 +282,39 @@ def check_bullet_alien_collisions(ai_settings, screen, stats, sb, ship, aliens,
 
 # When you call draw() on a group (an instance of Group()), Pygame automatically
 # draws each element in the group at the position defined by its rect attribute
-
-def create_fleet(ai_settings, screen, ship, aliens):
-    """Create a full fleet of aliens."""
-    # Create an alien and find the number of aliens in a row
-    # Spacing between each alien is equal to one alien width
-    alien = Alien(ai_settings, screen)
-    number_aliens_x = get_number_aliens_x(ai_settings, alien.rect.width)
-    number_rows = get_number_rows(ai_settings, ship.rect.height,
-                                  alien.rect.height)
-
-    # Create the fleet of aliens.
-    for row_number in range(number_rows):
-        for alien_number in range(number_aliens_x):
-            # Create an alien and place it in the row.
-            create_alien(ai_settings, screen, aliens, alien_number, row_number)
+# The fleet isn't a Group anymore, but its groupcollide() and draw() work the
+# same way, except each key in the dictionary is a bullet's index and each
+# value is a list of alien indices.
+
+def create_fleet(ai_settings, screen, ship, aliens, level=1):
+    """Create a full fleet of aliens in the formation for level."""
+    # The layout for each pattern and size is only worked out once; see
+    # waves.py.
+    x, y = waves.formation(waves.pattern_for_level(ai_settings, level),
+                           ai_settings.screen_width, ai_settings.screen_height,
+                           aliens.alien_width, aliens.alien_height,
+                           ship.rect.height)
+    aliens.spawn(x, y)
 
 def get_number_aliens_x(ai_settings, alien_width):
     """Determine the number of aliens that fit in a row."""
-    available_space_x = ai_settings.screen_width - 2 * alien_width
-    number_aliens_x = int(available_space_x / (2 * alien_width))
-    return number_aliens_x
+    return waves.columns_that_fit(ai_settings.screen_width, alien_width)
 
 def get_number_rows(ai_settings, ship_height, alien_height):
     """Determine the number of rows of aliens that fit on the screen."""
-    available_space_y = (ai_settings.screen_height -
-                         (3 * alien_height) - ship_height)
-    number_rows = int(available_space_y / (2 * alien_height))
-    return number_rows
-
-def create_alien(ai_settings, screen, aliens, alien_number, row_number):
-    """Create an alien and place it in the row."""
-    alien = Alien(ai_settings, screen)
-    alien_width = alien.rect.width
-    alien.x = alien_width + 2 * alien_width * alien_number
-    alien.rect.y = alien.rect.height + 2 * alien.rect.height * row_number
-    alien.rect.x = alien.x
-    aliens.add(alien)
-
-    # This function starts off with setting variables for Alien instances and
-    # alien_width. Then using our logic from before, it manages to find the
-    # number of aliens that can fit in our available space
-
-    # Now, we make a loop through the number of aliens and proceed to add the
-    # alien in their respective locations. To do this, we use each alien's
-    # range index as a part of our calculations. If we include an alien and
-    # then a alien_width space for every iteration, we should get 2 * 
-    # alien_width. If we multiply this product with their index number which
-    # just happens to be the numeric element of the range funcion
-    # (alien_number), we get how many alien spaces we should go before we draw
-    # each alien. Don't forget to add alien_width to this new product due to
-    # the margin. Then, we set the alien's rect x value to our final answer and
-    # add the finalized alien to our group aliens.
+    return waves.rows_that_fit(ai_settings.screen_height, alien_height,
+                               ship_height)
+
+# To place the aliens, we use each alien's index in its row as a part of our
+# calculations. If we include an alien and then a alien_width space for every
+# alien, we should get 2 * alien_width. If we multiply this product with the
+# alien's index number (alien_number), we get how many alien spaces we should
+# go before we draw each alien. Don't forget to add alien_width to this new
+# product due to the margin.
+
+# That math lives in waves.py now, where np.meshgrid() pairs every
+# alien_number with every row_number so it runs over whole arrays at once
+# instead of one alien at a time in a loop.
 
 # To finish the fleet, we're gonna need rows of these aliens. 
 # Fortunately, making this happen is easier than making the first row.
@@ -300,7 +337,7 @@ def update_aliens(ai_settings, screen, stats, sb, ship, aliens, bullets):
     aliens.update()
 
     # Look for alien_ship collisions.
-    if pygame.sprite.spritecollideany(ship, aliens):
+    if aliens.collide_any(ship):
         ship_hit(ai_settings, screen, stats, sb, ship, aliens, bullets)
     # Look for aliens hitting the bottom of the screen.
     check_aliens_bottom(ai_settings, screen, stats, sb, ship, aliens, bullets)
@@ -309,18 +346,38 @@ def update_aliens(ai_settings, screen, stats, sb, ship, aliens, bullets):
     # group. The method looks for any member of the group that's collided with
     # the sprite and stops looping through the group as it finds one. Here,
     # the group is aliens and ship is the sprite
+    # The fleet's collide_any() does the same job, but only looks at the
+    # aliens filed in the grid cells around the ship instead of the whole fleet.
+
+def update_alien_bullets(ai_settings, screen, stats, sb, ship, aliens,
+                         bullets):
+    """Let the fleet shoot back, and check its bullets against the ship."""
+    alien_bullets = aliens.bullets
+    if (ai_settings.alien_bullets_allowed and aliens.ready_to_fire() and
+            len(alien_bullets) < ai_settings.alien_bullets_allowed):
+        # The bottom alien in the column nearest the ship takes the shot.
+        shooter = aliens.choose_shooter(ship.rect.centerx)
+        if shooter is not None:
+            aliens.fire(shooter)
+    if not alien_bullets:
+        return
+    alien_bullets.update()
+    alien_bullets.cull()
+    # One comparison over every enemy bullet at once.
+    if len(alien_bullets.overlapping(ship.rect)):
+        ship_hit(ai_settings, screen, stats, sb, ship, aliens, bullets)
+
+    # With alien_bullets_allowed at 0, the default, the fleet never fires and
+    # this returns straight away, so the game plays just like it always has.
 
 def check_fleet_edges(ai_settings, aliens):
     """Respond appropriately if any aliens have reached an edge."""
-    for alien in aliens.sprites():
-        if alien.check_edges():
-            change_fleet_direction(ai_settings, aliens)
-            break
+    if aliens.check_edges():
+        change_fleet_direction(ai_settings, aliens)
 
 def change_fleet_direction(ai_settings, aliens):
     """Drop the entire fleet and change the fleet's direction."""
-    for alien in aliens.sprites():
-        alien.rect.y += ai_settings.fleet_drop_speed
+    aliens.drop(ai_settings.fleet_drop_speed)
     ai_settings.fleet_direction *= -1
 
 def ship_hit(ai_settings, screen, stats, sb, ship, aliens, bullets):
@@ -337,28 +394,32 @@ def ship_hit(ai_settings, screen, stats, sb, ship, aliens, bullets):
         bullets.empty()
 
         # Create a new fleet and center the ship
-        create_fleet(ai_settings, screen, ship, aliens)
+        create_fleet(ai_settings, screen, ship, aliens, stats.level)
         ship.center_ship()
 
-        # Pause
-        sleep(0.5)
+        # Pause, counted in ticks so the rest of the game keeps running.
+        respawn_ticks = round(ai_settings.respawn_pause *
+                              ai_settings.ticks_per_second)
+        if respawn_ticks > 0:
+            stats.set_state(RESPAWNING, respawn_ticks)
     
     else:
-        stats.game_active = False
+        stats.set_state(GAME_OVER)
         pygame.mouse.set_visible(True)
 
 # The sleep function from the time module pauses the game for its argument in
 # seconds. We redrew the fleet and recentered the ship everytime the ship 
 # was hit by an alien.
+# sleep() froze everything, though, even the window. Now ship_hit() puts the
+# game in the RESPAWNING state instead, and update_game() skips updating
+# until that state's timer runs out. See game_stats.py.
 
 def check_aliens_bottom(ai_settings, screen, stats, sb, ship, aliens, bullets):
     """Check if any aliens have reached the bottom of the screen."""
     screen_rect = screen.get_rect()
-    for alien in aliens.sprites():
-        if alien.rect.bottom >= screen_rect.bottom:
-            # Treat this the same as if the ship got hit.
-            ship_hit(ai_settings, screen, stats, sb, ship, aliens, bullets)
-            break
+    if aliens and aliens.bottom() >= screen_rect.bottom:
+        # Treat this the same as if the ship got hit.
+        ship_hit(ai_settings, screen, stats, sb, ship, aliens, bullets)
 
 def check_high_score(stats, sb):
     """Check to see if there's a new high score."""
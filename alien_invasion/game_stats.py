@@ -1,3 +1,10 @@
+# The states the game can be in. The game starts out in GAME_OVER, showing
+# the Play button.
+GAME_OVER = 'game_over'
+PLAYING = 'playing'
+RESPAWNING = 'respawning'
+PAUSED = 'paused'
+
 class GameStats():
     """Track statistics for Alien Invasion."""
 
@@ -5,24 +12,64 @@ class GameStats():
         """Initialize statistics."""
         self.ai_settings = ai_settings
         self.reset_stats()
-        # Start Alien Invasion in an active state.
-        self.game_active = False
-        # When you want to add AI to this game, just change this value to True
-        # instead of False.
+        # Start Alien Invasion in an inactive state.
+        self.state = GAME_OVER
+        # Ticks left before a timed state (like RESPAWNING) moves on.
+        self.state_timer = 0
+        # The state to go back to when the game is unpaused.
+        self.paused_state = None
         # High score should never be reset. which is why it is here and not
         # in reset_stats.
         self.high_score = 0
+
+    @property
+    def game_active(self):
+        """Return True while a game is underway, even if it's paused."""
+        return self.state != GAME_OVER
+
+    def set_state(self, state, ticks=0):
+        """Switch to state, and leave it after ticks ticks if it's timed."""
+        self.state = state
+        self.state_timer = ticks
+
+    def update_state(self):
+        """Count down the current state's timer by one tick."""
+        if self.state == RESPAWNING:
+            self.state_timer -= 1
+            if self.state_timer <= 0:
+                self.set_state(PLAYING)
+
+    def toggle_pause(self):
+        """Pause a game that's underway, or resume a paused one."""
+        if self.state == PAUSED:
+            self.state = self.paused_state
+        elif self.game_active:
+            self.paused_state = self.state
+            self.state = PAUSED
+
     def reset_stats(self):
         """Initialize statistics that can change during the game."""
         self.ships_left = self.ai_settings.ship_limit
         self.score = 0
         self.level = 1
+        # Bullets fired, bullets that hit something, and ticks spent playing.
+        self.shots_fired = 0
+        self.hits = 0
+        self.ticks_played = 0
 
 # Interesting, so we can use a class's own methods in its own definition even
 # though the method was only defined afterwards.
 # We intialize the score in reset_stats() to ensure that the score goes back to
 # 0 whenever the game restarts
 
+# game_active used to be a plain True/False. Now the game is always in one
+# of four states, and game_active just asks whether we're in any state but
+# GAME_OVER. RESPAWNING replaces the old sleep(0.5) after losing a ship:
+# instead of freezing the whole program, the game keeps drawing frames and
+# handling events, but doesn't update anything until the timer runs out.
+# Because the timer counts ticks, not seconds, a headless game can skip it
+# or run through it as fast as the CPU allows.
+
 # You should've recognized the new strategy that Matthes uses with
 # __init__ methods. If he wants an __init__ attribute to change over time
 # he puts the attribute in another method in the class and just calls
@@ -0,0 +1,148 @@
+import argparse
+import copy
+import os
+import random
+import time
+
+import pygame
+
+from settings import Settings
+from game_stats import GameStats
+from ship import Ship
+from scoreboard import Scoreboard
+from fleet import Fleet
+from projectiles import Projectiles
+import game_functions as gf
+import assets
+
+def init_headless(ai_settings):
+    """Set up pygame without a window and return the offscreen screen."""
+    # The dummy driver gives us real surfaces without needing a display.
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    # With no window to close, let SIGINT and SIGTERM stop the process the
+    # normal way instead of SDL turning them into QUIT events nobody reads.
+    os.environ.setdefault('SDL_NO_SIGNAL_HANDLERS', '1')
+    pygame.display.init()
+    pygame.font.init()
+
+    size = (ai_settings.screen_width, ai_settings.screen_height)
+    screen = pygame.display.get_surface()
+    if screen is None or screen.get_size() != size:
+        screen = pygame.display.set_mode(size)
+        # Images cached for an earlier display need its replacement's format.
+        assets.manager.convert_all()
+        assets.manager.preload(assets.IMAGE_PATHS)
+    return screen
+
+def random_policy(ai_settings, stats, ship, aliens, bullets, rng):
+    """Wander randomly and fire whenever a coin flip says so."""
+    return rng.choice((-1, 0, 1)), rng.random() < 0.5
+
+def sweep_policy(ai_settings, stats, ship, aliens, bullets, rng):
+    """Sweep from edge to edge while firing constantly."""
+    if ship.rect.right >= ship.screen_rect.right:
+        return -1, True
+    if ship.rect.left <= 0:
+        return 1, True
+    if ship.moving_left:
+        return -1, True
+    return 1, True
+
+POLICIES = {'random': random_policy, 'sweep': sweep_policy}
+
+def apply_action(ai_settings, screen, stats, ship, bullets, action):
+    """Turn a policy's (direction, fire) pair into ship input."""
+    direction, fire = action
+    ship.moving_right = direction > 0
+    ship.moving_left = direction < 0
+    if fire:
+        gf.fire_bullet(ai_settings, screen, stats, ship, bullets)
+
+def run_headless_game(ai_settings=None, policy=random_policy, max_ticks=100000,
+                      seed=None):
+    """Play one game without rendering and return a summary of it."""
+    # The game changes its settings as it speeds up, so play on a copy and
+    # leave the caller's alone.
+    ai_settings = copy.copy(ai_settings) if ai_settings else Settings()
+    # Nobody is watching, so there's no reason to pause between lives.
+    ai_settings.respawn_pause = 0
+    screen = init_headless(ai_settings)
+    rng = random.Random(seed)
+
+    stats = GameStats(ai_settings)
+    sb = Scoreboard(ai_settings, screen, stats)
+    ship = Ship(ai_settings, screen)
+    bullets = Projectiles(ai_settings, screen)
+    aliens = Fleet(ai_settings, screen)
+    gf.start_game(ai_settings, screen, stats, sb, ship, aliens, bullets)
+
+    ticks = 0
+    while stats.game_active and ticks < max_ticks:
+        action = policy(ai_settings, stats, ship, aliens, bullets, rng)
+        apply_action(ai_settings, screen, stats, ship, bullets, action)
+        gf.update_game(ai_settings, screen, stats, sb, ship, aliens, bullets)
+        ticks += 1
+
+    return {'seed': seed, 'score': stats.score, 'level': stats.level,
+            'ships_left': stats.ships_left, 'ticks': ticks,
+            'game_over': not stats.game_active}
+
+def run_headless_games(games, policy=random_policy, max_ticks=100000, seed=0):
+    """Yield the summary of each of several headless games in turn."""
+    for game_number in range(games):
+        yield run_headless_game(policy=policy, max_ticks=max_ticks,
+                                seed=seed + game_number)
+
+def positive_int(text):
+    """Turn text into a whole number of at least 1, for argparse."""
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            "expected a whole number, got {!r}".format(text))
+    if value < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return value
+
+def main():
+    """Run headless games from the command line and print a summary."""
+    parser = argparse.ArgumentParser(
+        description="Play Alien Invasion without a display.")
+    parser.add_argument('--games', type=positive_int, default=10)
+    parser.add_argument('--max-ticks', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='random')
+    parser.add_argument('--verbose', action='store_true',
+                        help="print every game, not just the summary")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = []
+    for result in run_headless_games(args.games, POLICIES[args.policy],
+                                     args.max_ticks, args.seed):
+        results.append(result)
+        if args.verbose:
+            print(result)
+    elapsed = time.perf_counter() - start
+
+    scores = [result['score'] for result in results]
+    levels = [result['level'] for result in results]
+    print("games: {}  mean score: {:.1f}  best score: {}  mean level: {:.2f}"
+          .format(len(results), sum(scores) / len(results), max(scores),
+                  sum(levels) / len(levels)))
+    print("{:.1f}s elapsed, {:.0f} games/min".format(
+        elapsed, len(results) / elapsed * 60))
+
+if __name__ == '__main__':
+    main()
+
+# The game logic never needed a window; it only needed surfaces to measure
+# and draw on. The SDL "dummy" video driver hands out real surfaces that
+# simply never get shown, so every function in game_functions works as is.
+# We just never call update_screen(), which is where all the drawing time
+# goes.
+
+# A policy stands in for the player. It looks at the game and returns which
+# way to move (-1, 0 or 1) and whether to fire. Each game gets its own
+# random.Random seeded from the command line, so the same seed always plays
+# the same game.
@@ -0,0 +1,198 @@
+import csv
+import json
+from collections import deque
+from time import perf_counter
+
+class Phase():
+    """A named part of the frame that the profiler times."""
+
+    def __init__(self, profiler, name):
+        """Initialize the phase with no time spent yet."""
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+        # Seconds spent in this phase so far this frame.
+        self.elapsed = 0.0
+        # Milliseconds spent in this phase on each of the last few frames.
+        self.history = deque(maxlen=profiler.window)
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.elapsed += perf_counter() - self.start
+        return False
+
+class NullPhase():
+    """A phase that times nothing, for when profiling is turned off."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+NULL_PHASE = NullPhase()
+
+class FrameProfiler():
+    """Time each phase of every frame and keep rolling statistics."""
+
+    def __init__(self, enabled=True, window=300, max_trace_frames=36000):
+        """Initialize the profiler with no frames recorded."""
+        self.enabled = enabled
+        self.window = window
+        # Phases in the order they were first used.
+        self.phases = {}
+        self.frame_start = 0.0
+        self.frame_times = deque(maxlen=window)
+        # One row per frame: the frame time, then each phase's time, in ms.
+        self.trace = deque(maxlen=max_trace_frames)
+        self.frames = 0
+
+    def phase(self, name):
+        """Return a context manager that times one phase of the frame."""
+        if not self.enabled:
+            return NULL_PHASE
+        phase = self.phases.get(name)
+        if phase is None:
+            phase = Phase(self, name)
+            self.phases[name] = phase
+        return phase
+
+    def begin_frame(self):
+        """Start timing a new frame."""
+        self.frame_start = perf_counter()
+
+    def end_frame(self):
+        """Finish the frame and file its times into the statistics."""
+        if not self.enabled:
+            return
+        frame_time = (perf_counter() - self.frame_start) * 1000
+        self.frame_times.append(frame_time)
+        row = {'frame': self.frames, 'frame_ms': frame_time}
+        for name, phase in self.phases.items():
+            phase_time = phase.elapsed * 1000
+            phase.history.append(phase_time)
+            row[name] = phase_time
+            phase.elapsed = 0.0
+        self.trace.append(row)
+        self.frames += 1
+
+    def summary(self):
+        """Return the p50, p95 and p99 in ms of the frame and each phase."""
+        summary = {'frame': percentiles(self.frame_times)}
+        for name, phase in self.phases.items():
+            summary[name] = percentiles(phase.history)
+        return summary
+
+    def report_lines(self):
+        """Return the summary as lines of text, slowest p99 first."""
+        lines = []
+        for name, (p50, p95, p99) in sorted(self.summary().items(),
+                key=lambda item: item[1][2], reverse=True):
+            lines.append("{:<30} {:7.2f} {:7.2f} {:7.2f}".format(
+                name, p50, p95, p99))
+        return lines
+
+    def dump(self, path):
+        """Write the trace to path, as JSON if it ends in .json, else CSV."""
+        rows = list(self.trace)
+        if path.endswith('.json'):
+            with open(path, 'w') as f:
+                json.dump({'summary': self.summary(), 'frames': rows}, f)
+            return
+        fieldnames = ['frame', 'frame_ms'] + list(self.phases)
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames, restval=0.0)
+            writer.writeheader()
+            writer.writerows(rows)
+
+# Stands in when nobody asked for profiling, so callers can always use one.
+NULL_PROFILER = FrameProfiler(enabled=False)
+
+def percentiles(samples):
+    """Return the 50th, 95th and 99th percentiles of samples."""
+    if not samples:
+        return (0.0, 0.0, 0.0)
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    return tuple(ordered[int(round(last * fraction))]
+                 for fraction in (0.50, 0.95, 0.99))
+
+class StartupTimer():
+    """Time each step of starting the game, from a given start time."""
+
+    def __init__(self, start=None):
+        """Start timing now, or from start if it's a perf_counter() time."""
+        self.start = perf_counter() if start is None else start
+        self.last = self.start
+        # (step name, seconds) in the order the steps happened.
+        self.steps = []
+
+    def mark(self, name):
+        """Record that the step called name just finished."""
+        now = perf_counter()
+        self.steps.append((name, now - self.last))
+        self.last = now
+
+    def total(self):
+        """Return the seconds from the start to the last step."""
+        return self.last - self.start
+
+    def report_lines(self):
+        """Return each step's time, then the total, as lines of text."""
+        lines = ["{:<30} {:7.1f} ms".format(name, seconds * 1000)
+                 for name, seconds in self.steps]
+        lines.append("{:<30} {:7.1f} ms".format('total', self.total() * 1000))
+        return lines
+
+class ProfilerOverlay():
+    """Draw the profiler's statistics in the corner of the screen."""
+
+    def __init__(self, profiler, screen, text, refresh_frames=30):
+        """Initialize the overlay; text is a TextCache for the font."""
+        self.profiler = profiler
+        self.screen = screen
+        self.text = text
+        self.refresh_frames = refresh_frames
+        self.images = []
+        self.last_refresh = None
+
+    def draw(self):
+        """Draw the overlay and return the rects it covers."""
+        # Sorting every window every frame would cost more than most of the
+        # phases being measured, so only refresh the text now and then.
+        frames = self.profiler.frames
+        if (self.last_refresh is None or
+                frames - self.last_refresh >= self.refresh_frames):
+            lines = ["{:<30} {:>7} {:>7} {:>7}".format(
+                'ms', 'p50', 'p95', 'p99')]
+            lines.extend(self.profiler.report_lines())
+            self.images = [self.text.font.render(line, True, (0, 0, 0),
+                           (255, 255, 255)) for line in lines]
+            self.last_refresh = frames
+
+        rects = []
+        y = self.screen.get_rect().bottom
+        for image in reversed(self.images):
+            y -= image.get_height()
+            rects.append(self.screen.blit(image, (10, y)))
+        return rects
+
+# You can't speed up what you can't measure. Each part of the main loop is
+# wrapped in "with profiler.phase(name):", which records how long it took.
+# At the end of every frame those times are filed away, and we keep the
+# last few hundred frames of each so we can ask for percentiles.
+
+# Averages hide spikes. The p99 is the time that 99% of frames beat, so if
+# the average is fine but the p99 is huge, something is stalling every now
+# and then, and that's exactly what players notice.
+
+# The trace keeps every frame (up to a limit) so it can be written to a CSV
+# or JSON file when the game exits and looked at afterwards.
+
+# StartupTimer is for the time before the first frame, which the frame
+# profiler never sees. run_game() marks each step of starting up, and the
+# breakdown is printed if it asks for it or if the first frame took longer
+# than the budget in settings.py.
@@ -0,0 +1,173 @@
+import numpy as np
+import pygame
+
+def round_half_away(values):
+    """Round the way pygame does when a float is assigned to a Rect."""
+    # Converting to an integer cuts toward zero, so adding a half away from
+    # zero first rounds halves away from zero.
+    return (values + np.copysign(0.5, values)).astype(np.int64)
+
+class Projectiles():
+    """Every bullet in flight, stored in arrays instead of one sprite each."""
+
+    def __init__(self, ai_settings, screen, kind='bullet', capacity=16):
+        """
+        Initialize an empty set of bullets with room for capacity. Their
+        size and color come from the kind_width, kind_height and kind_color
+        settings.
+        """
+        self.ai_settings = ai_settings
+        self.screen = screen
+        self.screen_rect = screen.get_rect()
+        self.setting_names = (kind + '_width', kind + '_height',
+                              kind + '_color')
+
+        # The first count entries of each array are the bullets in flight,
+        # oldest first. Bullets only ever fly straight up or down, so each
+        # has a fixed left edge, an exact y, a velocity in pixels per tick,
+        # and the top of its rect, rounded the way a Rect rounds.
+        self.count = 0
+        self.left = np.zeros(capacity, dtype=np.int64)
+        self.y = np.zeros(capacity)
+        self.velocity = np.zeros(capacity)
+        self.top = np.zeros(capacity, dtype=np.int64)
+
+        # One bullet drawn once, and the settings it was drawn with.
+        self.image = None
+        self.image_key = None
+
+    def __len__(self):
+        """Return how many bullets are in flight."""
+        return self.count
+
+    def size(self):
+        """Return the width and height every bullet has right now."""
+        width_name, height_name = self.setting_names[:2]
+        return (getattr(self.ai_settings, width_name),
+                getattr(self.ai_settings, height_name))
+
+    def grow(self):
+        """Double the room in every array, keeping the bullets in flight."""
+        for name in ('left', 'y', 'velocity', 'top'):
+            array = getattr(self, name)
+            bigger = np.zeros(len(array) * 2, dtype=array.dtype)
+            bigger[:self.count] = array[:self.count]
+            setattr(self, name, bigger)
+
+    def fire(self, centerx, top, velocity):
+        """
+        Add a bullet centered on centerx with its top edge at top, moving
+        velocity pixels down the screen each tick (up, if it's negative).
+        """
+        if self.count == len(self.y):
+            self.grow()
+        index = self.count
+        # Where Rect.centerx would put the bullet's left edge.
+        self.left[index] = centerx - self.size()[0] // 2
+        self.y[index] = self.top[index] = top
+        self.velocity[index] = velocity
+        self.count += 1
+
+    def update(self):
+        """Move every bullet one tick along its velocity."""
+        count = self.count
+        self.y[:count] += self.velocity[:count]
+        self.top[:count] = round_half_away(self.y[:count])
+
+    def keep(self, mask):
+        """Keep only the bullets in flight that mask is True for, in order."""
+        kept = mask.nonzero()[0]
+        if len(kept) == self.count:
+            return
+        for array in (self.left, self.y, self.velocity, self.top):
+            array[:len(kept)] = array[kept]
+        self.count = len(kept)
+
+    def cull(self):
+        """Get rid of every bullet that has left the top or bottom."""
+        top = self.top[:self.count]
+        self.keep((top + self.size()[1] > 0) &
+                  (top < self.screen_rect.bottom))
+
+    def kill(self, indices):
+        """Get rid of the bullets at indices."""
+        mask = np.ones(self.count, dtype=bool)
+        mask[indices] = False
+        self.keep(mask)
+
+    def empty(self):
+        """Get rid of every bullet."""
+        self.count = 0
+
+    def above(self, y):
+        """Return the indices of the bullets whose tops are above y."""
+        return (self.top[:self.count] < y).nonzero()[0]
+
+    def overlapping(self, rect):
+        """Return the indices of the bullets whose rects overlap rect."""
+        count = self.count
+        left = self.left[:count]
+        top = self.top[:count]
+        width, height = self.size()
+        return ((left < rect.right) & (left + width > rect.left) &
+                (top < rect.bottom) & (top + height > rect.top)).nonzero()[0]
+
+    def get_rect(self, index):
+        """Return the rect of the bullet at index."""
+        return pygame.Rect((int(self.left[index]), int(self.top[index])),
+                           self.size())
+
+    def bullet_image(self):
+        """Return a surface with one bullet on it, drawing it if needed."""
+        key = tuple(getattr(self.ai_settings, name)
+                    for name in self.setting_names)
+        if key != self.image_key:
+            self.image = pygame.Surface(key[:2])
+            if pygame.display.get_surface() is not None:
+                self.image = self.image.convert()
+            self.image.fill(key[2])
+            self.image_key = key
+        return self.image
+
+    def draw(self, alpha=1.0):
+        """
+        Draw every bullet alpha of the way from its last tick to this one,
+        and return the rects drawn on.
+        """
+        if not self.count:
+            return []
+        count = self.count
+        # Step back the part of a tick that hasn't happened yet, cutting
+        # fractions of a pixel off the way Rect.move() does.
+        tops = self.top[:count] - ((1 - alpha) *
+                                   self.velocity[:count]).astype(np.int64)
+        image = self.bullet_image()
+        return self.screen.blits([(image, position) for position in
+                                  zip(self.left[:count].tolist(),
+                                      tops.tolist())])
+
+# The bullets used to be sprites in a pooled sprite group. Every tick,
+# update() was a Python method call per bullet, culling checked each one's
+# rect in turn, and drawing called pygame.draw.rect() once per bullet. That
+# was fine with three bullets on the screen and slow with hundreds.
+
+# Now the bullets are rows in a handful of NumPy arrays. Moving them all is
+# a few array additions, and finding the ones that left the screen is one
+# comparison that gives a True/False mask. keep() packs the survivors to the
+# front of the arrays without changing their order, so the oldest bullet is
+# always checked for collisions first, just like the sprite group did.
+
+# Every bullet looks the same, so one is drawn onto a small surface and
+# Surface.blits() copies it to every bullet's position in a single call.
+# The surface is redrawn only if the bullet settings change.
+
+# The ship's bullets and the aliens' bullets are two Projectiles, one with
+# kind 'bullet' and one with kind 'alien_bullet', so each looks the way its
+# own settings say.
+
+# A bullet's velocity is stored with it when it's fired, the same way the
+# bullet sprites copied bullet_speed_factor. A positive velocity sends a
+# bullet down the screen instead of up, and cull() checks both the top and
+# bottom edges. A bullet fired from a ship that has drifted partly off the
+# side of the screen is kept until it leaves the top, just as the sprites
+# were, so recorded games replay exactly the same.
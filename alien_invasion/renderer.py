@@ -0,0 +1,65 @@
+import pygame
+
+class DirtyRenderer():
+    """Redraw and update only the parts of the screen that changed."""
+
+    def __init__(self, screen, bg_color, display=pygame.display):
+        """Initialize the renderer with a cached copy of the background."""
+        self.screen = screen
+        # Whatever shows the screen: pygame.display, or a scaling Display.
+        self.display = display
+        self.set_background(bg_color)
+        # Rects drawn on the last frame, and so far on this one.
+        self.previous_rects = []
+        self.rects = []
+
+    def set_background(self, bg_color):
+        """Fill the cached background and redraw the whole screen next."""
+        self.background = pygame.Surface(self.screen.get_size())
+        if pygame.display.get_surface() is not None:
+            self.background = self.background.convert()
+        self.background.fill(bg_color)
+        self.invalidate()
+
+    def invalidate(self):
+        """Repaint and update the entire screen on the next frame."""
+        self.full_redraw = True
+
+    def begin_frame(self):
+        """Erase everything that was drawn on the last frame."""
+        if self.full_redraw:
+            self.screen.blit(self.background, (0, 0))
+        else:
+            for rect in self.previous_rects:
+                self.screen.blit(self.background, rect, rect)
+
+    def add(self, rect):
+        """Record that rect was drawn this frame."""
+        if rect:
+            self.rects.append(rect)
+
+    def add_all(self, rects):
+        """Record that every rect in rects was drawn this frame."""
+        self.rects.extend(rect for rect in rects if rect)
+
+    def end_frame(self):
+        """Show this frame, updating only what changed since the last."""
+        if self.full_redraw:
+            self.display.flip()
+            self.full_redraw = False
+        else:
+            # The old rects need updating too, since whatever was there is
+            # gone now.
+            self.display.update(self.previous_rects + self.rects)
+        self.previous_rects, self.rects = self.rects, self.previous_rects
+        self.rects.clear()
+
+# Filling the whole 1200x800 screen and flipping it every frame means
+# pushing almost a million pixels around, even when all that moved was a
+# bullet. Now every draw call hands back the rect it drew on, and the
+# renderer remembers them. Next frame it paints the background back over
+# just those rects, and tells the display to update only the old rects
+# (where things disappeared) and the new ones (where things appeared).
+
+# A blank rect (width or height of 0) is falsy, which is why add() skips
+# them; there's nothing to update there.
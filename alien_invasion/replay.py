@@ -0,0 +1,248 @@
+import argparse
+import json
+import struct
+import sys
+import time
+import zlib
+
+import pygame
+
+from game_stats import GameStats
+from button import Button
+from ship import Ship
+from scoreboard import Scoreboard
+from fleet import Fleet
+from projectiles import Projectiles
+from headless import init_headless
+from controls import Controls
+import game_functions as gf
+import config
+
+# A replay file starts with a header, followed by records. Every record
+# starts with its kind and the tick it belongs to.
+MAGIC = b'AIRP'
+VERSION = 2
+# Version 1 files are the same, minus settings records.
+READABLE_VERSIONS = (1, 2)
+HEADER = struct.Struct('<4sBH')
+RECORD = struct.Struct('<BI')
+# An event record: event code, key (or mouse button), and x, y position.
+EVENT = struct.Struct('<BIhh')
+# A hash record: the CRC-32 of the game state after the tick ran.
+HASH = struct.Struct('<I')
+# A settings record: the length of the JSON that follows it.
+SETTINGS = struct.Struct('<H')
+
+EVENT_RECORD = 1
+HASH_RECORD = 2
+SETTINGS_RECORD = 3
+
+# Stands in for a settings reload among a tick's events, with the changed
+# settings in its changes attribute.
+SETTINGS_CHANGED = pygame.event.custom_type()
+
+# The only events that can change the game, with a small code for each.
+EVENT_CODES = {
+    pygame.QUIT: 1,
+    pygame.KEYDOWN: 2,
+    pygame.KEYUP: 3,
+    pygame.MOUSEBUTTONDOWN: 4,
+}
+EVENT_TYPES = {code: event_type for event_type, code in EVENT_CODES.items()}
+
+class Recorder():
+    """Write every tick's input and resulting state hash to a file."""
+
+    def __init__(self, path, ticks_per_second):
+        """Open path for writing and write the header."""
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, ticks_per_second))
+        # The tick that the next events will be handled before.
+        self.tick = 0
+
+    def record_events(self, events):
+        """Record the events about to be handled before the next tick."""
+        for event in events:
+            code = EVENT_CODES.get(event.type)
+            if code is None:
+                continue
+            key = getattr(event, 'key', getattr(event, 'button', 0))
+            x, y = getattr(event, 'pos', (0, 0))
+            self.file.write(RECORD.pack(EVENT_RECORD, self.tick))
+            self.file.write(EVENT.pack(code, key, x, y))
+
+    def record_settings(self, changes):
+        """Record settings reloaded before the next tick."""
+        data = json.dumps(changes, sort_keys=True).encode()
+        self.file.write(RECORD.pack(SETTINGS_RECORD, self.tick))
+        self.file.write(SETTINGS.pack(len(data)))
+        self.file.write(data)
+
+    def end_tick(self, state):
+        """Record the state hash after a tick and move on to the next."""
+        self.file.write(RECORD.pack(HASH_RECORD, self.tick))
+        self.file.write(HASH.pack(state))
+        self.tick += 1
+
+    def close(self):
+        """Flush everything to disk."""
+        if not self.file.closed:
+            self.file.close()
+
+def load_replay(path):
+    """Return (ticks_per_second, events by tick, hashes by tick) from path."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, version, ticks_per_second = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version not in READABLE_VERSIONS:
+        raise ValueError("{} is not a version {} replay".format(path, VERSION))
+
+    events = {}
+    hashes = []
+    offset = HEADER.size
+    while offset < len(data):
+        kind, tick = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        if kind == EVENT_RECORD:
+            code, key, x, y = EVENT.unpack_from(data, offset)
+            offset += EVENT.size
+            events.setdefault(tick, []).append(make_event(code, key, x, y))
+        elif kind == HASH_RECORD:
+            hashes.append(HASH.unpack_from(data, offset)[0])
+            offset += HASH.size
+        elif kind == SETTINGS_RECORD:
+            length = SETTINGS.unpack_from(data, offset)[0]
+            offset += SETTINGS.size
+            changes = json.loads(data[offset:offset + length].decode())
+            offset += length
+            # JSON turns tuples into lists; validating turns them back.
+            changes = {name: config.validate(name, value)
+                       for name, value in changes.items()}
+            events.setdefault(tick, []).append(
+                pygame.event.Event(SETTINGS_CHANGED, changes=changes))
+        else:
+            raise ValueError("unknown record kind {} at byte {}".format(
+                kind, offset - RECORD.size))
+    return ticks_per_second, events, hashes
+
+def make_event(code, key, x, y):
+    """Rebuild a pygame event from its recorded fields."""
+    event_type = EVENT_TYPES[code]
+    if event_type == pygame.MOUSEBUTTONDOWN:
+        return pygame.event.Event(event_type, button=key, pos=(x, y))
+    if event_type == pygame.QUIT:
+        return pygame.event.Event(event_type)
+    return pygame.event.Event(event_type, key=key)
+
+def ends_game(event, controls):
+    """Return True for events that would make check_events() exit."""
+    return controls.dispatch.get(
+        (event.type, getattr(event, 'key', None))) == 'quit'
+
+def state_hash(ai_settings, stats, ship, aliens, bullets):
+    """Return a CRC-32 of everything the simulation depends on."""
+    count = len(bullets)
+    bullet_positions = sorted(zip(bullets.left[:count].tolist(),
+                                  bullets.y[:count].tolist()))
+    state = (stats.state, stats.state_timer, stats.score, stats.level,
+             stats.ships_left, ship.center, ship.moving_left,
+             ship.moving_right, aliens.offset_x, aliens.offset_y,
+             ai_settings.fleet_direction, ai_settings.alien_speed_factor,
+             bullet_positions)
+    alien_bullets = aliens.bullets
+    if ai_settings.alien_bullets_allowed or alien_bullets:
+        # Only games with return fire hash it, so older recordings, made
+        # before aliens could shoot, still match.
+        count = len(alien_bullets)
+        state += (aliens.fire_timer,
+                  list(zip(alien_bullets.left[:count].tolist(),
+                           alien_bullets.y[:count].tolist())))
+    state = repr(state).encode()
+    return zlib.crc32(aliens.alive.tobytes(), zlib.crc32(state))
+
+def run_replay(path, verify=True, config_path=None):
+    """Play a recorded game back headlessly and return a summary of it."""
+    ticks_per_second, events, hashes = load_replay(path)
+    # The game has to be set up the same way it was when it was recorded.
+    ai_settings = config.load_settings(config_path)
+    ai_settings.ticks_per_second = ticks_per_second
+    screen = init_headless(ai_settings)
+
+    # Set everything up exactly the way run_game() does.
+    stats = GameStats(ai_settings)
+    sb = Scoreboard(ai_settings, screen, stats)
+    ship = Ship(ai_settings, screen)
+    bullets = Projectiles(ai_settings, screen)
+    aliens = Fleet(ai_settings, screen)
+    gf.create_fleet(ai_settings, screen, ship, aliens)
+    play_button = Button(ai_settings, screen, "Play")
+    controls = Controls(ai_settings.key_bindings)
+
+    mismatch = None
+    for tick in range(len(hashes)):
+        tick_events = events.get(tick, [])
+        if any(ends_game(event, controls) for event in tick_events):
+            break
+        # The game reloads settings at the start of a frame, so handle the
+        # events on either side of a reload separately, in order.
+        frame_events = []
+        for event in tick_events:
+            if event.type == SETTINGS_CHANGED:
+                gf.check_events(ai_settings, screen, stats, sb, play_button,
+                                ship, aliens, bullets, controls, frame_events)
+                config.apply(ai_settings, event.changes)
+                frame_events = []
+            else:
+                frame_events.append(event)
+        gf.check_events(ai_settings, screen, stats, sb, play_button, ship,
+                        aliens, bullets, controls, frame_events)
+        gf.update_game(ai_settings, screen, stats, sb, ship, aliens, bullets)
+        if verify and state_hash(ai_settings, stats, ship, aliens,
+                                 bullets) != hashes[tick]:
+            mismatch = tick
+            break
+
+    return {'ticks': len(hashes), 'mismatch': mismatch, 'score': stats.score,
+            'level': stats.level}
+
+def main():
+    """Replay a recording from the command line and check it still matches."""
+    parser = argparse.ArgumentParser(
+        description="Replay a recorded Alien Invasion game without a display.")
+    parser.add_argument('path')
+    parser.add_argument('--no-verify', action='store_true',
+                        help="don't compare state hashes")
+    parser.add_argument('--config', metavar='PATH',
+                        help="the settings file the game was recorded with")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = run_replay(args.path, verify=not args.no_verify,
+                        config_path=args.config)
+    elapsed = time.perf_counter() - start
+    print("{ticks} ticks, score {score}, level {level}".format(**result))
+    print("replayed in {:.2f}s".format(elapsed))
+    if result['mismatch'] is not None:
+        print("state diverged from the recording at tick {}".format(
+            result['mismatch']))
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
+
+# The game has no randomness and runs on a fixed timestep, so the same input
+# on the same ticks always plays out the same way. That means recording a
+# game only takes recording the input: which events arrived before which
+# tick. Each event is 14 bytes on disk.
+
+# Settings reloaded from the config file in the middle of a game change how
+# it plays, so they're recorded too, as JSON, in their place among the
+# events. The replay applies them at the same point the game did.
+
+# After each tick the recorder also stores a hash of the game state. The
+# replay computes the same hash after running the same tick, so if any code
+# change makes the game behave even slightly differently, we find out the
+# exact tick where it first happened.
+
+# The replay never draws anything and never waits for the clock, so it
+# runs as fast as the simulation itself does.
@@ -0,0 +1,461 @@
+import argparse
+import copy
+import sys
+import time
+
+import numpy as np
+
+from settings import Settings
+import config
+from game_stats import GameStats
+from ship import Ship
+from scoreboard import Scoreboard
+from fleet import Fleet
+from projectiles import Projectiles, round_half_away
+from headless import init_headless, apply_action
+import game_functions as gf
+
+# Every action is a (direction, fire) pair, numbered so an agent only has to
+# pick one integer.
+ACTIONS = ((0, False), (-1, False), (1, False),
+           (0, True), (-1, True), (1, True))
+DIRECTIONS = np.array([direction for direction, fire in ACTIONS])
+FIRES = np.array([fire for direction, fire in ACTIONS])
+
+class AlienInvasionEnv():
+    """One game of Alien Invasion behind a reset()/step() interface."""
+
+    def __init__(self, ai_settings=None, max_steps=None):
+        """Initialize the environment; call reset() before stepping it."""
+        # The game speeds its settings up as it plays, so play on a copy
+        # and leave the caller's alone.
+        self.ai_settings = (copy.copy(ai_settings) if ai_settings
+                            else Settings())
+        # Nobody is watching, so there's no reason to pause between lives.
+        self.ai_settings.respawn_pause = 0
+        self.screen = init_headless(self.ai_settings)
+        self.max_steps = max_steps
+        self.action_count = len(ACTIONS)
+        self.steps = 0
+
+    def reset(self, seed=None):
+        """Start a new game and return (observation, info)."""
+        # The game has no randomness, so seed is only taken for the sake of
+        # code written against other environments.
+        self.stats = GameStats(self.ai_settings)
+        self.sb = Scoreboard(self.ai_settings, self.screen, self.stats)
+        self.ship = Ship(self.ai_settings, self.screen)
+        self.bullets = Projectiles(self.ai_settings, self.screen)
+        self.aliens = Fleet(self.ai_settings, self.screen)
+        gf.start_game(self.ai_settings, self.screen, self.stats, self.sb,
+                      self.ship, self.aliens, self.bullets)
+        self.steps = 0
+        return self.observation(), self.info()
+
+    def step(self, action):
+        """
+        Play one tick with the action numbered action, and return
+        (observation, reward, terminated, truncated, info).
+        """
+        score = self.stats.score
+        apply_action(self.ai_settings, self.screen, self.stats, self.ship,
+                     self.bullets, ACTIONS[action])
+        gf.update_game(self.ai_settings, self.screen, self.stats, self.sb,
+                       self.ship, self.aliens, self.bullets)
+        self.steps += 1
+        terminated = not self.stats.game_active
+        truncated = (self.max_steps is not None and
+                     self.steps >= self.max_steps and not terminated)
+        return (self.observation(), self.stats.score - score, terminated,
+                truncated, self.info())
+
+    def observation(self):
+        """Return the ship, alien and bullet positions as NumPy arrays."""
+        offset_x, offset_y = self.aliens.screen_offset()
+        aliens = np.stack((self.aliens.x + offset_x,
+                           self.aliens.y + offset_y), axis=1)
+        bullets = np.zeros((self.ai_settings.bullets_allowed, 2),
+                           dtype=np.float32)
+        bullet_active = np.zeros(self.ai_settings.bullets_allowed, dtype=bool)
+        count = min(len(self.bullets), self.ai_settings.bullets_allowed)
+        bullets[:count, 0] = self.bullets.left[:count]
+        bullets[:count, 1] = self.bullets.top[:count]
+        bullet_active[:count] = True
+        # The fleet's bullets, in a block sized by alien_bullets_allowed.
+        alien_bullets = np.zeros((self.ai_settings.alien_bullets_allowed, 2),
+                                 dtype=np.float32)
+        alien_bullet_active = np.zeros(self.ai_settings.alien_bullets_allowed,
+                                       dtype=bool)
+        count = min(len(self.aliens.bullets),
+                    self.ai_settings.alien_bullets_allowed)
+        alien_bullets[:count, 0] = self.aliens.bullets.left[:count]
+        alien_bullets[:count, 1] = self.aliens.bullets.top[:count]
+        alien_bullet_active[:count] = True
+        return {'ship_x': np.float32(self.ship.rect.centerx),
+                'aliens': aliens.astype(np.float32),
+                'alive': self.aliens.alive.copy(),
+                'bullets': bullets, 'bullet_active': bullet_active,
+                'alien_bullets': alien_bullets,
+                'alien_bullet_active': alien_bullet_active}
+
+    def info(self):
+        """Return the scoreboard numbers."""
+        return {'score': self.stats.score, 'level': self.stats.level,
+                'ships_left': self.stats.ships_left}
+
+class VectorAlienInvasionEnv():
+    """
+    Many games stepped together, with the whole game state held in NumPy
+    arrays that have one row per game.
+    """
+
+    def __init__(self, num_envs, ai_settings=None, max_steps=None):
+        """Initialize num_envs games; call reset() before stepping them."""
+        self.num_envs = num_envs
+        self.ai_settings = ai_settings or Settings()
+        self.max_steps = max_steps
+        self.action_count = len(ACTIONS)
+        if len(self.ai_settings.wave_patterns) > 1:
+            raise ValueError("the vector env only plays one wave pattern")
+        if self.ai_settings.alien_bullets_allowed:
+            raise ValueError("the vector env doesn't play return fire")
+
+        # Let the real game lay out the formation and measure the sprites,
+        # so the arrays below always agree with it.
+        screen = init_headless(self.ai_settings)
+        ship = Ship(self.ai_settings, screen)
+        fleet = Fleet(self.ai_settings, screen)
+        gf.create_fleet(self.ai_settings, screen, ship, fleet)
+        # Every level's fleet is the same, so this one formation covers them.
+        self.alien_x = fleet.x.astype(np.int64)
+        self.alien_y = fleet.y.astype(np.int64)
+        self.alien_width = fleet.alien_width
+        self.alien_height = fleet.alien_height
+        self.ship_width = ship.rect.width
+        self.ship_height = ship.rect.height
+        self.ship_top = ship.rect.top
+        self.screen_width = screen.get_rect().width
+        self.screen_height = screen.get_rect().height
+
+        n = num_envs
+        bullets = self.ai_settings.bullets_allowed
+        self.rows = np.arange(n)
+        self.ship_center = np.zeros(n)
+        # The ship's rect only catches up with its center in update(), just
+        # like Ship.rect.centerx does.
+        self.ship_x = np.zeros(n, dtype=np.int64)
+        self.bullet_x = np.zeros((n, bullets), dtype=np.int64)
+        self.bullet_y = np.zeros((n, bullets))
+        self.bullet_rect_y = np.zeros((n, bullets), dtype=np.int64)
+        self.bullet_active = np.zeros((n, bullets), dtype=bool)
+        self.alive = np.zeros((n, len(self.alien_x)), dtype=bool)
+        self.offset_x = np.zeros(n)
+        self.offset_y = np.zeros(n, dtype=np.int64)
+        self.fleet_direction = np.zeros(n, dtype=np.int64)
+        self.ship_speed = np.zeros(n)
+        self.bullet_speed = np.zeros(n)
+        self.alien_speed = np.zeros(n)
+        self.alien_points = np.zeros(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.level = np.zeros(n, dtype=np.int64)
+        self.ships_left = np.zeros(n, dtype=np.int64)
+        self.steps = np.zeros(n, dtype=np.int64)
+
+    def reset(self, seed=None):
+        """Start every game over and return (observations, info)."""
+        self.reset_envs(np.ones(self.num_envs, dtype=bool))
+        return self.observation(), self.info()
+
+    def reset_envs(self, mask):
+        """Start the games picked out by the boolean array mask over."""
+        # Every game starts from the configured values, not settings.py's.
+        settings = copy.copy(self.ai_settings)
+        settings.initialize_dynamic_settings()
+        self.ship_center[mask] = self.screen_width // 2
+        self.ship_x[mask] = self.screen_width // 2
+        self.bullet_active[mask] = False
+        self.alive[mask] = True
+        self.offset_x[mask] = 0.0
+        self.offset_y[mask] = 0
+        self.fleet_direction[mask] = settings.fleet_direction
+        self.ship_speed[mask] = settings.ship_speed_factor
+        self.bullet_speed[mask] = settings.bullet_speed_factor
+        self.alien_speed[mask] = settings.alien_speed_factor
+        self.alien_points[mask] = settings.alien_points
+        self.score[mask] = 0
+        self.level[mask] = 1
+        self.ships_left[mask] = self.ai_settings.ship_limit
+        self.steps[mask] = 0
+
+    def step(self, actions):
+        """
+        Play one tick of every game, each with its own action, and return
+        (observations, rewards, terminated, truncated, info). Games that end
+        are started over, and info holds their final scores.
+        """
+        actions = np.asarray(actions)
+        score = self.score.copy()
+        self.fire(FIRES[actions])
+        self.update_ship(DIRECTIONS[actions])
+        self.update_bullets()
+        self.check_bullet_alien_collisions()
+        terminated = self.update_aliens()
+        self.steps += 1
+
+        if self.max_steps is None:
+            truncated = np.zeros(self.num_envs, dtype=bool)
+        else:
+            truncated = (self.steps >= self.max_steps) & ~terminated
+        rewards = self.score - score
+        info = self.info()
+        finished = terminated | truncated
+        if finished.any():
+            info['final_score'] = np.where(finished, self.score, 0)
+            info['final_level'] = np.where(finished, self.level, 0)
+            self.reset_envs(finished)
+        return self.observation(), rewards, terminated, truncated, info
+
+    def fire(self, fire):
+        """Fire a bullet in each game that asked to and has one to spare."""
+        free = ~self.bullet_active
+        fire = fire & free.any(axis=1)
+        rows = self.rows[fire]
+        slots = free[fire].argmax(axis=1)
+        self.bullet_x[rows, slots] = (self.ship_x[fire] -
+                                      self.ai_settings.bullet_width // 2)
+        self.bullet_y[rows, slots] = self.ship_top
+        self.bullet_rect_y[rows, slots] = self.ship_top
+        self.bullet_active[rows, slots] = True
+
+    def update_ship(self, direction):
+        """Move each ship the way Ship.update() does."""
+        left = self.ship_x - self.ship_width // 2
+        right = left + self.ship_width
+        moving = (((direction > 0) & (right < self.screen_width)) |
+                  ((direction < 0) & (left > 0)))
+        self.ship_center += np.where(moving, direction * self.ship_speed, 0.0)
+        self.ship_x = round_half_away(self.ship_center)
+
+    def update_bullets(self):
+        """Move every bullet up and get rid of the ones off the screen."""
+        self.bullet_y -= self.bullet_speed[:, None]
+        self.bullet_rect_y = round_half_away(self.bullet_y)
+        self.bullet_active &= (self.bullet_rect_y +
+                               self.ai_settings.bullet_height > 0)
+
+    def rounded_offset_x(self):
+        """Return each fleet's whole-pixel x offset, as Fleet rounds it."""
+        return np.floor(self.offset_x + 0.5).astype(np.int64)
+
+    def alien_rects(self):
+        """Return the left and top of every alien on the screen."""
+        left = self.alien_x + self.rounded_offset_x()[:, None]
+        top = self.alien_y + self.offset_y[:, None]
+        return left, top
+
+    def check_bullet_alien_collisions(self):
+        """Remove bullets and aliens that collided, and start new levels."""
+        alien_left, alien_top = self.alien_rects()
+        # Older bullets are higher up, and the game checks them first.
+        order = np.argsort(np.where(self.bullet_active, self.bullet_rect_y,
+                                    np.iinfo(np.int64).max), axis=1)
+        bullet_width = self.ai_settings.bullet_width
+        bullet_height = self.ai_settings.bullet_height
+        for rank in range(order.shape[1]):
+            slots = order[:, rank]
+            active = self.bullet_active[self.rows, slots]
+            if not active.any():
+                break
+            left = self.bullet_x[self.rows, slots][:, None]
+            top = self.bullet_rect_y[self.rows, slots][:, None]
+            hit = (self.alive & active[:, None] &
+                   (left < alien_left + self.alien_width) &
+                   (left + bullet_width > alien_left) &
+                   (top < alien_top + self.alien_height) &
+                   (top + bullet_height > alien_top))
+            hits = hit.sum(axis=1)
+            self.alive &= ~hit
+            self.bullet_active[self.rows, slots] &= hits == 0
+            self.score += self.alien_points * hits
+
+        cleared = ~self.alive.any(axis=1)
+        if cleared.any():
+            self.bullet_active[cleared] = False
+            scale = self.ai_settings.speedup_scale
+            self.ship_speed[cleared] *= scale
+            self.bullet_speed[cleared] *= scale
+            self.alien_speed[cleared] *= scale
+            self.alien_points[cleared] = (self.alien_points[cleared] *
+                self.ai_settings.score_scale).astype(np.int64)
+            self.level[cleared] += 1
+            self.respawn_fleets(cleared)
+
+    def respawn_fleets(self, mask):
+        """Give the games picked out by mask a fresh fleet."""
+        self.alive[mask] = True
+        self.offset_x[mask] = 0.0
+        self.offset_y[mask] = 0
+
+    def update_aliens(self):
+        """Move the fleets, and return which games just ended."""
+        living_x = np.where(self.alive, self.alien_x, 0)
+        offset = self.rounded_offset_x()
+        left = np.where(self.alive, self.alien_x,
+                        np.iinfo(np.int64).max).min(axis=1) + offset
+        right = living_x.max(axis=1) + offset + self.alien_width
+        at_edge = (right >= self.screen_width) | (left <= 0)
+        self.offset_y[at_edge] += self.ai_settings.fleet_drop_speed
+        self.fleet_direction[at_edge] *= -1
+        self.offset_x += self.alien_speed * self.fleet_direction
+
+        alien_left, alien_top = self.alien_rects()
+        ship_left = (self.ship_x - self.ship_width // 2)[:, None]
+        ship_collided = (self.alive &
+                         (ship_left < alien_left + self.alien_width) &
+                         (ship_left + self.ship_width > alien_left) &
+                         (self.ship_top < alien_top + self.alien_height) &
+                         (self.ship_top + self.ship_height > alien_top)
+                         ).any(axis=1)
+        bottom = (np.where(self.alive, self.alien_y, 0).max(axis=1) +
+                  self.offset_y + self.alien_height)
+        hit = ship_collided | (bottom >= self.screen_height)
+
+        terminated = hit & (self.ships_left <= 0)
+        respawn = hit & ~terminated
+        if respawn.any():
+            self.ships_left[respawn] -= 1
+            self.bullet_active[respawn] = False
+            self.respawn_fleets(respawn)
+            self.ship_center[respawn] = self.screen_width // 2
+        return terminated
+
+    def observation(self):
+        """Return every game's ship, alien and bullet positions."""
+        alien_left, alien_top = self.alien_rects()
+        return {'ship_x': self.ship_x.astype(np.float32),
+                'aliens': np.stack((alien_left, alien_top),
+                                   axis=2).astype(np.float32),
+                'alive': self.alive.copy(),
+                'bullets': np.stack((self.bullet_x, self.bullet_rect_y),
+                                    axis=2).astype(np.float32),
+                'bullet_active': self.bullet_active.copy(),
+                # The aliens never shoot here, but the keys match the
+                # single game's.
+                'alien_bullets': np.zeros((self.num_envs, 0, 2),
+                                          dtype=np.float32),
+                'alien_bullet_active': np.zeros((self.num_envs, 0),
+                                                dtype=bool)}
+
+    def info(self):
+        """Return every game's scoreboard numbers."""
+        return {'score': self.score.copy(), 'level': self.level.copy(),
+                'ships_left': self.ships_left.copy()}
+
+def check_parity(ai_settings, num_envs=4, steps=20000, seed=0):
+    """
+    Play the same random actions in both environments, and return the first
+    (step, game) where their score, level or alien count differ, or None.
+    """
+    rng = np.random.default_rng(seed)
+    vector_env = VectorAlienInvasionEnv(num_envs, copy.copy(ai_settings))
+    vector_env.reset()
+    envs = [AlienInvasionEnv(ai_settings) for game in range(num_envs)]
+    for env in envs:
+        env.reset()
+
+    for step in range(steps):
+        actions = rng.integers(len(ACTIONS), size=num_envs)
+        observation, rewards, terminated, truncated, info = vector_env.step(
+            actions)
+        for game, env in enumerate(envs):
+            game_observation, _, game_over, _, game_info = env.step(
+                actions[game])
+            if terminated[game] != game_over:
+                return step, game
+            if game_over:
+                # The vector env has already started this game over.
+                if (info['final_score'][game] != game_info['score'] or
+                        info['final_level'][game] != game_info['level']):
+                    return step, game
+                env.reset()
+            elif (info['score'][game] != game_info['score'] or
+                    info['level'][game] != game_info['level'] or
+                    observation['alive'][game].sum() !=
+                    game_observation['alive'].sum()):
+                return step, game
+    return None
+
+def main():
+    """Measure how many steps per second the environments can take."""
+    parser = argparse.ArgumentParser(
+        description="Step Alien Invasion environments with random actions.")
+    parser.add_argument('--envs', type=int, default=1024,
+                        help="games stepped together by the vector env")
+    parser.add_argument('--steps', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--check', action='store_true',
+                        help="check the two envs play the same games instead")
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    if args.check:
+        # Settings come from the config file and environment, so the check
+        # covers whatever the envs are being trained with.
+        ai_settings = config.load_settings(config.find_config_path())
+        mismatch = check_parity(ai_settings, seed=args.seed)
+        if mismatch is None:
+            print("The envs agree.")
+        else:
+            print("The envs disagree at step {}, game {}.".format(*mismatch))
+            sys.exit(1)
+        return
+
+    env = AlienInvasionEnv()
+    env.reset()
+    actions = rng.integers(len(ACTIONS), size=args.steps)
+    start = time.perf_counter()
+    for action in actions:
+        observation, reward, terminated, truncated, info = env.step(action)
+        if terminated or truncated:
+            env.reset()
+    elapsed = time.perf_counter() - start
+    print("single env: {:,.0f} steps/s".format(args.steps / elapsed))
+
+    vector_env = VectorAlienInvasionEnv(args.envs)
+    vector_env.reset()
+    actions = rng.integers(len(ACTIONS), size=(args.steps, args.envs))
+    start = time.perf_counter()
+    for step_actions in actions:
+        vector_env.step(step_actions)
+    elapsed = time.perf_counter() - start
+    print("vector env ({} games): {:,.0f} steps/s".format(
+        args.envs, args.steps * args.envs / elapsed))
+
+if __name__ == '__main__':
+    main()
+
+# AlienInvasionEnv is the real game with a different front end: step() does
+# what the headless runner does for one tick, and the observation is read
+# straight out of the fleet's arrays and the Projectiles arrays that hold
+# the bullets. It's exactly the game, but every tick still goes through the
+# game's Python functions one game at a time, so it manages tens of
+# thousands of steps per second at best.
+
+# VectorAlienInvasionEnv plays the same rules on arrays with a row per game,
+# so a step of a thousand games costs about as much Python as a step of
+# one. Every rule in update_game() has a line or two here, down to how
+# pygame rounds a float into a Rect, so the two environments play the same
+# actions into the same scores. If you change a rule in game_functions.py,
+# change it here too and check they still agree with
+#   python rl_env.py --check
+# which plays both on the same random actions and stops at the first step
+# where a score, level or number of aliens left differs.
+
+# Both follow the usual reset()/step() shape for reinforcement learning
+# code: step() returns the observation, the score gained as the reward, and
+# whether the game ended (terminated) or just ran out of steps (truncated).
+# The vector env starts finished games over by itself.
+
+# Return fire (alien_bullets_allowed above 0) is only in the single game for
+# now. The vector env refuses settings that turn it on rather than quietly
+# play different rules from the game it's meant to match.
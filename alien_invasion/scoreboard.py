@@ -1,7 +1,7 @@
-import pygame.font
 from pygame.sprite import Group
 
 from ship import Ship
+import text_cache
 
 class Scoreboard():
     """A class to report scoring information."""
@@ -15,21 +15,27 @@ class Scoreboard():
 
         # Font settings for scoring information.
         self.text_color = (30, 30, 30)
-        self.font = pygame.font.SysFont(None, 48)
+        self.text = text_cache.get_cache(None, 48)
 
         # Prepare the initial score image.
-        self.prep_score()
+        self.render_score()
         self.prep_high_score()
         self.prep_level()
         self.prep_ships()
     
     def prep_score(self):
+        """Mark the score image as out of date."""
+        # Several hits in one frame only cost one render, in show_score().
+        self.score_stale = True
+
+    def render_score(self):
         """Turn the score into a rendered image."""
         rounded_score = int(round(self.stats.score, -1))
         score_str = "{:,}".format(rounded_score)
         # score_str = str(self.stats.score)
-        self.score_image = self.font.render(score_str, True, self.text_color,
-                                            self.ai_settings.bg_color)
+        self.score_image = self.text.render_glyphs(score_str, self.text_color,
+                                                   self.ai_settings.bg_color)
+        self.score_stale = False
         
         # Display the score at the top right of the screen.
         self.score_rect = self.score_image.get_rect()
@@ -47,12 +53,15 @@ class Scoreboard():
         # just expand the number to the left.
 
     def show_score(self):
-        """Draw scores and ships to the screen."""
-        self.screen.blit(self.score_image, self.score_rect)
-        self.screen.blit(self.high_score_image, self.high_score_rect)
-        self.screen.blit(self.level_image, self.level_rect)
+        """Draw scores and ships to the screen and return the rects drawn."""
+        if self.score_stale:
+            self.render_score()
+        rects = [self.screen.blit(self.score_image, self.score_rect),
+                 self.screen.blit(self.high_score_image, self.high_score_rect),
+                 self.screen.blit(self.level_image, self.level_rect)]
         # Draw ships.
-        self.ships.draw(self.screen)
+        rects.extend(self.ships.draw(self.screen))
+        return rects
 
 # Since most arcade games report scores as multiples of 10, we can do that
 # using rounded score. The round() function normally rounds a decimal number to 
@@ -65,7 +74,7 @@ class Scoreboard():
         """Turn the high score into a rendered image."""
         high_score = int(round(self.stats.high_score, -1))
         high_score_str = "{:,}".format(high_score)
-        self.high_score_image = self.font.render(high_score_str, True,
+        self.high_score_image = self.text.render_glyphs(high_score_str,
             self.text_color, self.ai_settings.bg_color)
         
         # Center the high score at the top of the screen.
@@ -75,7 +84,7 @@ class Scoreboard():
 
     def prep_level(self):
         """Turn the level into a rendered image."""
-        self.level_image = self.font.render(str(self.stats.level), True,
+        self.level_image = self.text.render_glyphs(str(self.stats.level),
             self.text_color, self.ai_settings.bg_color)
         
         # Position the level below the score.
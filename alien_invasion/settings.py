@@ -1,3 +1,9 @@
+# Settings that initialize_dynamic_settings() resets at the start of every
+# game. A config file sets where they start from, not their current value.
+DYNAMIC_SETTINGS = ('ship_speed_factor', 'bullet_speed_factor',
+                    'alien_speed_factor', 'alien_bullet_speed_factor',
+                    'fleet_direction', 'alien_points')
+
 class Settings():
     """A class to store all settings for Alien Invasion."""
 
@@ -7,9 +13,70 @@ class Settings():
         self.screen_width = 1200
         self.screen_height = 800
         self.bg_color = (230, 230, 230)
+
+        # Window settings
+        # The game always plays on a screen_width x screen_height surface,
+        # which is scaled to fit the window. None means the same size.
+        self.window_width = None
+        self.window_height = None
+        self.fullscreen = False
+        # How to scale: one of display.SCALE_MODES.
+        self.scale_mode = 'scaled'
+
+        # Timing settings
+        # The simulation always advances in steps of 1/ticks_per_second, so
+        # every speed factor below is measured in pixels per tick.
+        self.ticks_per_second = 240
+        # Rendering is capped separately; 0 means draw as often as possible.
+        self.max_fps = 60
+        # Let the display driver pace frames to the monitor's refresh rate.
+        self.vsync = False
+
+        # Profiler settings
+        # Time each phase of the main loop. F3 shows the times on screen.
+        self.profile = True
+        self.show_profiler = False
+        # Where to write every frame's times on exit (.csv or .json), if at
+        # all.
+        self.profile_trace_path = None
+        # Print how long each step of starting up took.
+        self.startup_report = False
+        # Seconds the first frame should be on screen within. Going over
+        # prints the startup report whatever startup_report says.
+        self.first_frame_budget = 0.25
+
+        # Control settings
+        # The keys for each action in controls.py, by the names that
+        # pygame.key.name() gives them. A config file can bind more than one.
+        self.key_bindings = {
+            'move_left': ('left',),
+            'move_right': ('right',),
+            'fire': ('space',),
+            'play': ('p',),
+            'pause': ('escape',),
+            'profiler': ('f3',),
+            'quit': ('q',),
+        }
+
+        # Replay settings
+        # Where to record every tick's input for replay.py, if at all.
+        self.record_path = None
+
+        # Stats settings
+        # Where to save high scores and past games, or None to save nothing.
+        self.stats_path = 'stats.db'
+
+        # Telemetry settings
+        # The port to serve live stats on for Prometheus, or None for none.
+        self.telemetry_port = None
+        self.telemetry_host = '127.0.0.1'
+        # Seconds between snapshots of the game.
+        self.telemetry_interval = 0.5
     
         # Ship settings
         self.ship_limit = 1
+        # Seconds to wait after losing a ship before play resumes.
+        self.respawn_pause = 0.5
 
         # Bullet settings
         self.bullet_width = 3
@@ -19,29 +86,49 @@ class Settings():
 
         # Alien settings
         self.fleet_drop_speed = 10
+        # The formations in waves.py to use, one after another each level.
+        self.wave_patterns = ('grid',)
+        # How big aliens are drawn compared to their image.
+        self.alien_scale = 1.0
+
+        # Alien fire settings
+        # How many alien bullets can be on the screen at once. The original
+        # game has no return fire, so 0 leaves it off.
+        self.alien_bullets_allowed = 0
+        # Seconds between shots from the fleet.
+        self.alien_fire_interval = 0.75
+        self.alien_bullet_width = 3
+        self.alien_bullet_height = 15
+        self.alien_bullet_color = (200, 40, 40)
 
         # How quickly the game speeds up
         self.speedup_scale = 1.1
         # How quickly the alien opint values increase
         self.score_scale = 1.5
 
+        # Starting values for dynamic settings that a config file changed.
+        self.dynamic_overrides = {}
         self.initialize_dynamic_settings()
 
     def initialize_dynamic_settings(self):
         """Initialize settings that change throughout the game."""
-        self.ship_speed_factor = 1
-        self.bullet_speed_factor = 3
+        self.ship_speed_factor = 1.0
+        self.bullet_speed_factor = 3.0
         self.alien_speed_factor = 0.25
+        self.alien_bullet_speed_factor = 1.5
         # fleet_direction of 1 represents right; -1 represents left.
         self.fleet_direction = 1
         # Scoring
         self.alien_points = 50
+        for name, value in self.dynamic_overrides.items():
+            setattr(self, name, value)
 
     def increase_speed(self):
         """Increase speed settings and alien point values."""
         self.ship_speed_factor *= self.speedup_scale
         self.bullet_speed_factor *= self.speedup_scale
         self.alien_speed_factor *= self.speedup_scale
+        self.alien_bullet_speed_factor *= self.speedup_scale
         self.alien_points = int(self.alien_points * self.score_scale)
 # This is a module called settings that contains a class called Settings.
 # This approach allows us to pass around one settings object instead of many
@@ -1,10 +1,18 @@
-import pygame
-from pygame.sprite import Sprite
+import assets
+from compact_sprite import CompactSprite
+from timestep import interpolate
 
-class Ship(Sprite):
+class Ship(CompactSprite):
     """Making the ship object"""
 # We changed ship to be a sprite so we can add more of them to the screen
 # like the ship lives.
+
+    # The player's ship and the lives in the scoreboard all get the same
+    # loaded image from the assets manager.
+    image_path = 'images/ship.bmp'
+    __slots__ = ('ai_settings', 'screen', 'image', 'rect', 'screen_rect',
+                 'center', 'previous_center', 'moving_right', 'moving_left')
+
     def __init__(self, ai_settings, screen):
         """Initialize the ship and set its starting position."""
         super().__init__()
@@ -12,7 +20,7 @@ class Ship(Sprite):
         self.ai_settings = ai_settings
 
         # Load the ship image and get its rect.
-        self.image = pygame.image.load('images/ship.bmp')
+        self.image = assets.manager.load_image(self.image_path)
         self.rect = self.image.get_rect()
         self.screen_rect = screen.get_rect()
 
@@ -22,6 +30,8 @@ class Ship(Sprite):
 
         # Store a decimal value for the ship's center.
         self.center = float(self.rect.centerx)
+        # Where the ship was one tick ago, for drawing between ticks.
+        self.previous_center = self.center
 
         # Movement flag
         self.moving_right = False
@@ -29,6 +39,7 @@ class Ship(Sprite):
 
     def update(self):
         """Update the ship's position based on the movement flags."""
+        self.previous_center = self.center
         # Update the ship's center value, not the rect
         if self.moving_right and self.rect.right < self.screen_rect.right:
             self.center += self.ai_settings.ship_speed_factor
@@ -39,13 +50,18 @@ class Ship(Sprite):
         # Update rect object from self.center.
         self.rect.centerx = self.center
     
-    def blitme(self):
-        """Draw the ship at its current location."""
-        self.screen.blit(self.image, self.rect)
+    def blitme(self, alpha=1.0):
+        """Draw the ship alpha of the way from its last tick to this one."""
+        draw_rect = self.rect.copy()
+        draw_rect.centerx = interpolate(self.previous_center, self.center,
+                                        alpha)
+        return self.screen.blit(self.image, draw_rect)
     
     def center_ship(self):
         """Center the ship on the screen."""
         self.center = self.screen_rect.centerx
+        # Don't slide back to the middle; just appear there.
+        self.previous_center = self.center
 # Let's break down all of this nonsense. Note: The blit() method draws 
 # the image.
 # First, we import the pygame module as usual. The __init__() method of Ship
@@ -0,0 +1,92 @@
+class SpatialHash():
+    """Bucket items into a uniform grid of cells by their rects."""
+
+    def __init__(self, cell_size):
+        """Initialize an empty grid with square cells of cell_size pixels."""
+        self.cell_size = cell_size
+        # Maps (column, row) to the set of items touching that cell.
+        self.cells = {}
+        # Maps each item to the block of cells it was last filed under.
+        self.item_bounds = {}
+
+    def bounds_for(self, rect):
+        """Return the first and last column and row that rect touches."""
+        size = self.cell_size
+        # Rects don't include their right and bottom edges, hence the - 1.
+        return (int(rect.left // size), int((rect.right - 1) // size),
+                int(rect.top // size), int((rect.bottom - 1) // size))
+
+    def cells_in(self, bounds):
+        """Return the (column, row) of every cell within bounds."""
+        left, right, top, bottom = bounds
+        return [(column, row) for column in range(left, right + 1)
+                for row in range(top, bottom + 1)]
+
+    def insert(self, item, rect):
+        """File item under every cell its rect touches."""
+        bounds = self.bounds_for(rect)
+        self.item_bounds[item] = bounds
+        for cell in self.cells_in(bounds):
+            self.cells.setdefault(cell, set()).add(item)
+
+    def insert_many(self, items, lefts, tops, widths, heights):
+        """File many items at once, given NumPy arrays of their rects."""
+        size = self.cell_size
+        # Work out every item's cells in one go instead of one rect at a time.
+        all_bounds = zip((lefts // size).tolist(),
+                         ((lefts + widths - 1) // size).tolist(),
+                         (tops // size).tolist(),
+                         ((tops + heights - 1) // size).tolist())
+        cells = self.cells
+        for item, bounds in zip(items, all_bounds):
+            self.item_bounds[item] = bounds
+            for cell in self.cells_in(bounds):
+                bucket = cells.get(cell)
+                if bucket is None:
+                    cells[cell] = {item}
+                else:
+                    bucket.add(item)
+
+    def remove(self, item):
+        """Take item out of the grid if it's there."""
+        bounds = self.item_bounds.pop(item, None)
+        if bounds is None:
+            return
+        for cell in self.cells_in(bounds):
+            bucket = self.cells[cell]
+            bucket.discard(item)
+            if not bucket:
+                del self.cells[cell]
+
+    def move(self, item, rect):
+        """Refile item after it moves, if it has crossed into new cells."""
+        # Most moves stay inside the same cells, which costs nothing here.
+        if self.bounds_for(rect) != self.item_bounds.get(item):
+            self.remove(item)
+            self.insert(item, rect)
+
+    def query(self, rect):
+        """Return the set of items sharing at least one cell with rect."""
+        found = set()
+        for cell in self.cells_in(self.bounds_for(rect)):
+            bucket = self.cells.get(cell)
+            if bucket:
+                found.update(bucket)
+        return found
+
+    def clear(self):
+        """Remove every item from the grid."""
+        self.cells.clear()
+        self.item_bounds.clear()
+
+    def __len__(self):
+        return len(self.item_bounds)
+
+# Checking every bullet against every alien means doubling both the bullets
+# and the aliens makes collision checks four times slower. Instead, things
+# are sorted into a grid of cells, and a bullet only gets checked against
+# whatever is filed in the cells it overlaps. That's a handful of rect tests
+# no matter how big the fleet gets.
+
+# Items can be anything hashable. The fleet files alien indices here, and
+# move() only does real work when an item crosses into a different cell.
@@ -0,0 +1,114 @@
+import queue
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    finished_at REAL NOT NULL,
+    score INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    duration REAL NOT NULL,
+    shots_fired INTEGER NOT NULL,
+    hits INTEGER NOT NULL,
+    game_over INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_by_score ON games (score);
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    ended_at REAL NOT NULL,
+    frames INTEGER NOT NULL,
+    frame_p50 REAL,
+    frame_p95 REAL,
+    frame_p99 REAL
+);
+"""
+
+INSERT_GAME = """INSERT INTO games (finished_at, score, level, duration,
+    shots_fired, hits, game_over) VALUES (?, ?, ?, ?, ?, ?, ?)"""
+INSERT_SESSION = """INSERT INTO sessions (started_at, ended_at, frames,
+    frame_p50, frame_p95, frame_p99) VALUES (?, ?, ?, ?, ?, ?)"""
+
+class StatsStore():
+    """Save high scores, finished games and session summaries to SQLite."""
+
+    def __init__(self, path):
+        """Open the database at path on a background writer thread."""
+        self.path = path
+        self.started_at = time.time()
+        self.writes = queue.Queue()
+        self.loaded = threading.Event()
+        self.best_score = 0
+        self.error = None
+        self.thread = threading.Thread(target=self.run, name='stats-store',
+                                       daemon=True)
+        self.thread.start()
+
+    def run(self):
+        """Own the database connection and apply every queued write."""
+        try:
+            connection = sqlite3.connect(self.path)
+            connection.executescript(SCHEMA)
+            # The index makes this one lookup, however many games are saved.
+            best = connection.execute("SELECT MAX(score) FROM games")
+            self.best_score = best.fetchone()[0] or 0
+        except sqlite3.Error as e:
+            self.error = e
+            return
+        finally:
+            self.loaded.set()
+
+        while True:
+            write = self.writes.get()
+            if write is None:
+                break
+            sql, params = write
+            try:
+                connection.execute(sql, params)
+                # Commit each write so a crash loses at most one game.
+                connection.commit()
+            # Scores grow without limit, and SQLite stops at 64 bits.
+            except (sqlite3.Error, OverflowError) as e:
+                self.error = e
+        connection.close()
+
+    def high_score(self, timeout=1.0):
+        """Return the best score ever saved, or 0 if it can't be read."""
+        self.loaded.wait(timeout)
+        return self.best_score
+
+    def record_game(self, ai_settings, stats):
+        """Queue the game stats describes to be saved."""
+        self.best_score = max(self.best_score, stats.score)
+        self.writes.put((INSERT_GAME, (time.time(), stats.score, stats.level,
+            stats.ticks_played / ai_settings.ticks_per_second,
+            stats.shots_fired, stats.hits, not stats.game_active)))
+
+    def record_session(self, profiler):
+        """Queue this session's frame-time percentiles to be saved."""
+        p50, p95, p99 = profiler.summary()['frame']
+        self.writes.put((INSERT_SESSION, (self.started_at, time.time(),
+                                          profiler.frames, p50, p95, p99)))
+
+    def close(self, timeout=2.0):
+        """Finish every queued write and close the database."""
+        self.writes.put(None)
+        self.thread.join(timeout)
+
+# High scores used to disappear every time the game closed. Now each game
+# that ends is written to a small SQLite database, along with how long it
+# lasted and how accurate the player was, and each session adds a line with
+# its frame-time percentiles from the profiler.
+
+# Disk writes can take anywhere from nothing to a noticeable fraction of a
+# second, and the main loop can't afford to wait. So the main loop only
+# puts writes on a queue, and a background thread that owns the database
+# connection does the actual writing.
+
+# Loading is lazy in the same way: the thread opens the database and looks
+# up the single best score while pygame is still starting up, and nothing
+# else is read at all. Everything else in the file is only there for
+# looking at later, for example with
+#   sqlite3 stats.db "SELECT * FROM games ORDER BY score DESC LIMIT 10"
@@ -0,0 +1,183 @@
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from game_stats import GAME_OVER, PLAYING, RESPAWNING, PAUSED
+from profiler import percentiles
+
+STATES = (GAME_OVER, PLAYING, RESPAWNING, PAUSED)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Each stat published, as (metric name, GameStats attribute, help text).
+STAT_GAUGES = (
+    ('score', 'score', "Points scored in the current game."),
+    ('high_score', 'high_score', "Best score so far."),
+    ('level', 'level', "Current level."),
+    ('ships_left', 'ships_left', "Ships left in reserve."),
+    ('shots_fired', 'shots_fired', "Bullets fired in the current game."),
+    ('hits', 'hits', "Bullets that hit an alien in the current game."),
+    ('ticks_played', 'ticks_played', "Ticks played in the current game."),
+)
+
+class Snapshot():
+    """The numbers the exporter publishes, copied out of one frame."""
+
+    def __init__(self, stats, profiler, aliens, bullets, frames):
+        """Copy what's needed, so the game can carry on changing."""
+        self.taken_at = time.time()
+        self.frames = frames
+        self.state = stats.state
+        self.stats = {name: getattr(stats, attribute)
+                      for name, attribute, _ in STAT_GAUGES}
+        # Sorting these is left to the writer thread.
+        self.frame_times = list(profiler.frame_times)
+        self.entities = {'aliens': len(aliens), 'bullets': len(bullets),
+                         'alien_bullets': len(aliens.bullets)}
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Answer GET /metrics with the exporter's latest page."""
+
+    # The exporter whose page is served; set on a subclass per exporter.
+    exporter = None
+    # Give up on a client that stops reading, so it can't hold the server.
+    timeout = 5
+
+    def do_GET(self):
+        """Send the metrics page, or a 404 for anything else."""
+        if self.path not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        page = self.exporter.page
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(page)))
+        self.end_headers()
+        self.wfile.write(page)
+
+    def log_message(self, format, *args):
+        """Keep scrapes out of the terminal."""
+
+class TelemetryExporter():
+    """Serve the game's stats as Prometheus metrics from background threads."""
+
+    def __init__(self, host, port, interval=0.5, max_pending=8):
+        """
+        Start serving on host and port, publishing a snapshot at most every
+        interval seconds. Raises OSError if the port can't be opened.
+        """
+        self.interval = interval
+        self.next_publish = 0.0
+        self.frames = 0
+        # Snapshots thrown away because the writer fell behind.
+        self.dropped = 0
+        self.snapshots = queue.Queue(max_pending)
+        # The latest metrics page. Replacing it is a single assignment, so
+        # the server never sees half of one.
+        self.page = self.format_page(None)
+
+        handler = type('Handler', (MetricsHandler,), {'exporter': self})
+        self.server = HTTPServer((host, port), handler)
+        self.port = self.server.server_address[1]
+
+        self.writer = threading.Thread(target=self.run,
+                                       name='telemetry-writer', daemon=True)
+        self.server_thread = threading.Thread(
+            target=self.server.serve_forever, name='telemetry-server',
+            daemon=True)
+        self.writer.start()
+        self.server_thread.start()
+
+    def publish(self, stats, profiler, aliens, bullets):
+        """Queue a snapshot of the game if it's time, without ever waiting."""
+        self.frames += 1
+        now = time.monotonic()
+        if now < self.next_publish:
+            return
+        self.next_publish = now + self.interval
+        snapshot = Snapshot(stats, profiler, aliens, bullets, self.frames)
+        try:
+            self.snapshots.put_nowait(snapshot)
+        except queue.Full:
+            # The newest numbers matter most, so make room by dropping the
+            # oldest snapshot instead of this one.
+            self.dropped += 1
+            try:
+                self.snapshots.get_nowait()
+                self.snapshots.put_nowait(snapshot)
+            except (queue.Empty, queue.Full):
+                pass
+
+    def run(self):
+        """Turn each queued snapshot into the metrics page."""
+        while True:
+            snapshot = self.snapshots.get()
+            if snapshot is None:
+                break
+            self.page = self.format_page(snapshot)
+
+    def format_page(self, snapshot):
+        """Return the Prometheus text for snapshot, or just the counters."""
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append("# HELP alien_invasion_{} {}".format(name, help_text))
+            lines.append("# TYPE alien_invasion_{} {}".format(name, kind))
+            for labels, value in samples:
+                lines.append("alien_invasion_{}{} {}".format(name, labels,
+                                                             value))
+
+        metric('telemetry_dropped_total', 'counter',
+               "Snapshots dropped because the writer fell behind.",
+               [('', self.dropped)])
+        if snapshot is not None:
+            metric('frames_total', 'counter', "Frames drawn.",
+                   [('', snapshot.frames)])
+            metric('snapshot_timestamp_seconds', 'gauge',
+                   "When these numbers were taken.",
+                   [('', '{:.3f}'.format(snapshot.taken_at))])
+            for name, _, help_text in STAT_GAUGES:
+                metric(name, 'gauge', help_text,
+                       [('', snapshot.stats[name])])
+            metric('state', 'gauge', "1 for the state the game is in.",
+                   [('{{state="{}"}}'.format(state),
+                     int(state == snapshot.state)) for state in STATES])
+            frame_ms = percentiles(snapshot.frame_times)
+            metric('frame_seconds', 'gauge',
+                   "Frame time percentiles over the profiler's window.",
+                   [('{{quantile="{}"}}'.format(quantile),
+                     '{:.6f}'.format(ms / 1000))
+                    for quantile, ms in zip(('0.5', '0.95', '0.99'),
+                                            frame_ms)])
+            metric('entities', 'gauge', "Things on the screen, by kind.",
+                   [('{{kind="{}"}}'.format(kind), count)
+                    for kind, count in snapshot.entities.items()])
+        return ('\n'.join(lines) + '\n').encode()
+
+    def close(self, timeout=1.0):
+        """Stop serving and stop the writer."""
+        self.server.shutdown()
+        self.server.server_close()
+        try:
+            self.snapshots.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self.writer.join(timeout)
+
+# Watching a live game used to mean watching the screen. Set telemetry_port
+# (ALIEN_INVASION_TELEMETRY_PORT=9100, say) and the game serves its
+# scoreboard, frame times and how many aliens and bullets are out at
+#   http://127.0.0.1:9100/metrics
+# in the plain text format Prometheus scrapes, which curl can read too.
+
+# None of it runs on the main loop. Each frame, publish() only checks the
+# clock, and a couple of times a second it copies a handful of numbers into
+# a Snapshot and puts it on a small queue. A writer thread formats the page
+# and a server thread hands it to whoever asks, the same way stats_store.py
+# keeps SQLite off the main loop.
+
+# The queue is bounded and publish() never waits on it. If the writer falls
+# behind, the oldest snapshot is thrown away and
+# alien_invasion_telemetry_dropped_total goes up, and a client that connects
+# and never reads is cut off after a few seconds, so nothing on the other
+# end of the socket can slow the game down.
@@ -0,0 +1,95 @@
+from collections import OrderedDict
+
+import pygame
+
+class TextCache():
+    """Render text with one font and keep the images for reuse."""
+
+    def __init__(self, font, max_strings=64):
+        """Initialize empty caches for whole strings and single glyphs."""
+        self.font = font
+        self.max_strings = max_strings
+        # Whole strings, least recently used first.
+        self.strings = OrderedDict()
+        # Single characters. There are only a few of these, so no limit.
+        self.glyphs = {}
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, text, color, background=None):
+        """Return an image of text, rendering it only if it isn't cached."""
+        key = (text, color, background)
+        image = self.strings.get(key)
+        if image is not None:
+            self.hits += 1
+            self.strings.move_to_end(key)
+            return image
+
+        self.misses += 1
+        image = self.font.render(text, True, color, background)
+        self.strings[key] = image
+        if len(self.strings) > self.max_strings:
+            self.strings.popitem(last=False)
+        return image
+
+    def glyph(self, char, color, background=None):
+        """Return the cached image of a single character."""
+        key = (char, color, background)
+        image = self.glyphs.get(key)
+        if image is None:
+            self.misses += 1
+            image = self.font.render(char, True, color, background)
+            self.glyphs[key] = image
+        else:
+            self.hits += 1
+        return image
+
+    def render_glyphs(self, text, color, background=None):
+        """Return an image of text pieced together from cached glyphs."""
+        glyphs = [self.glyph(char, color, background) for char in text]
+        width = sum(glyph.get_width() for glyph in glyphs)
+        height = self.font.get_height()
+        if background is None:
+            image = pygame.Surface((width, height), pygame.SRCALPHA)
+        else:
+            image = pygame.Surface((width, height))
+            image.fill(background)
+
+        x = 0
+        for glyph in glyphs:
+            image.blit(glyph, (x, 0))
+            x += glyph.get_width()
+        return image
+
+    def stats(self):
+        """Return a dictionary describing how well the cache is doing."""
+        return {'strings': len(self.strings), 'glyphs': len(self.glyphs),
+                'hits': self.hits, 'misses': self.misses}
+
+# One cache per (font name, size), shared by everything that draws text.
+_caches = {}
+
+def get_cache(name=None, size=48):
+    """Return the shared TextCache for the given font, making it if needed."""
+    key = (name, size)
+    cache = _caches.get(key)
+    if cache is None:
+        if name is None:
+            # SysFont() scans every font on the system before it notices we
+            # asked for the default one, which is bundled with pygame.
+            font = pygame.font.Font(None, size)
+        else:
+            font = pygame.font.SysFont(name, size)
+        cache = TextCache(font)
+        _caches[key] = cache
+    return cache
+
+# font.render() lays out and rasterizes the whole string every time, and the
+# score used to be re-rendered on every single hit. But a score is only ever
+# made of the digits 0-9 and commas, so we render each of those once and
+# build any number by blitting them side by side. That's eleven renders for
+# the whole game instead of one per hit.
+
+# Strings that aren't numbers, like the Play button's text, go through
+# render() instead, which remembers the last few strings it made. When it's
+# full, the one that hasn't been asked for the longest gets thrown out.
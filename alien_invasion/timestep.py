@@ -0,0 +1,55 @@
+import pygame
+
+class FixedTimestep():
+    """Pace the main loop and decide how many simulation ticks to run."""
+
+    def __init__(self, ticks_per_second, max_fps=0, max_ticks_per_frame=None):
+        """Initialize the accumulator for the given tick and frame rates."""
+        self.tick_length = 1.0 / ticks_per_second
+        self.max_fps = max_fps
+        # Never try to catch up more than a quarter second in one frame.
+        # Without a limit, one slow frame makes the next one slower still.
+        if max_ticks_per_frame is None:
+            max_ticks_per_frame = max(1, ticks_per_second // 4)
+        self.max_ticks_per_frame = max_ticks_per_frame
+
+        self.clock = pygame.time.Clock()
+        self.accumulator = 0.0
+        self.alpha = 0.0
+        self.ticks = 0
+
+    def advance(self):
+        """Wait for the next frame and return the number of ticks to run."""
+        # Clock.tick() sleeps just long enough to hold the frame rate down,
+        # which is what stops the loop from pegging the CPU.
+        self.accumulator += self.clock.tick(self.max_fps) / 1000.0
+
+        steps = int(self.accumulator / self.tick_length)
+        if steps > self.max_ticks_per_frame:
+            steps = self.max_ticks_per_frame
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * self.tick_length
+        self.ticks += steps
+
+        # How far we are between the last tick and the next one, from 0 to 1.
+        self.alpha = self.accumulator / self.tick_length
+        return steps
+
+    def get_fps(self):
+        """Return the average number of frames drawn per second."""
+        return self.clock.get_fps()
+
+def interpolate(previous, current, alpha):
+    """Return the value alpha of the way from previous to current."""
+    return previous + (current - previous) * alpha
+
+# The idea here is to separate "how often the game thinks" from "how often
+# the game draws". Every tick moves things by exactly the same amount, so a
+# fast machine and a slow machine play the same game; they just draw a
+# different number of frames in between.
+
+# Real time goes into the accumulator each frame, and we take out as many
+# whole ticks as fit. Whatever is left over is less than one tick, and alpha
+# tells the drawing code how far into that next tick we are, so moving
+# things can be drawn between their last two positions instead of jumping.
@@ -0,0 +1,155 @@
+import sys
+from functools import lru_cache
+
+import numpy as np
+import pygame
+
+from settings import Settings
+
+def columns_that_fit(screen_width, alien_width, spacing=2):
+    """Return how many aliens fit in a row, spacing alien widths apart."""
+    available_space_x = screen_width - 2 * alien_width
+    return max(0, int(available_space_x / (spacing * alien_width)))
+
+def rows_that_fit(screen_height, alien_height, ship_height, spacing=2):
+    """Return how many rows fit above the ship, spacing alien heights apart."""
+    available_space_y = screen_height - (3 * alien_height) - ship_height
+    return max(0, int(available_space_y / (spacing * alien_height)))
+
+def lay_out(columns, rows, alien_width, alien_height, spacing=2):
+    """Return the x and y of every alien in a columns by rows grid."""
+    column_numbers, row_numbers = np.meshgrid(np.arange(columns),
+                                              np.arange(rows))
+    x = alien_width + spacing * alien_width * column_numbers.ravel()
+    y = alien_height + spacing * alien_height * row_numbers.ravel()
+    return x, y, column_numbers.ravel(), row_numbers.ravel()
+
+def grid(screen_width, screen_height, alien_width, alien_height, ship_height):
+    """The original fleet: one grid, an alien's width between aliens."""
+    x, y, columns, rows = lay_out(
+        columns_that_fit(screen_width, alien_width),
+        rows_that_fit(screen_height, alien_height, ship_height),
+        alien_width, alien_height)
+    return x, y
+
+def staggered(screen_width, screen_height, alien_width, alien_height,
+              ship_height):
+    """A grid with every other row shifted half a step to the right."""
+    x, y, columns, rows = lay_out(
+        columns_that_fit(screen_width, alien_width),
+        rows_that_fit(screen_height, alien_height, ship_height),
+        alien_width, alien_height)
+    return x + (rows % 2) * alien_width, y
+
+def twin(screen_width, screen_height, alien_width, alien_height,
+         ship_height):
+    """Two grids side by side, with a gap down the middle."""
+    column_count = columns_that_fit(screen_width, alien_width)
+    x, y, columns, rows = lay_out(
+        column_count,
+        rows_that_fit(screen_height, alien_height, ship_height),
+        alien_width, alien_height)
+    if column_count < 3:
+        # Too narrow for a gap; a third of the columns would be none of them
+        # and the gap all of them.
+        return x, y
+    # Leave out the middle third of the columns.
+    gap = (columns >= column_count // 3) & (columns < column_count -
+                                            column_count // 3)
+    return x[~gap], y[~gap]
+
+def swarm(screen_width, screen_height, alien_width, alien_height,
+          ship_height):
+    """Aliens packed in tight, a quarter of their size apart."""
+    x, y, columns, rows = lay_out(
+        columns_that_fit(screen_width, alien_width, 1.25),
+        rows_that_fit(screen_height, alien_height, ship_height, 1.25),
+        alien_width, alien_height, 1.25)
+    return x, y
+
+PATTERNS = {'grid': grid, 'staggered': staggered, 'twin': twin,
+            'swarm': swarm}
+
+@lru_cache(maxsize=64)
+def formation(pattern, screen_width, screen_height, alien_width,
+              alien_height, ship_height):
+    """
+    Return the x and y arrays of the named pattern's formation, working each
+    layout out only once.
+    """
+    x, y = PATTERNS[pattern](screen_width, screen_height, alien_width,
+                             alien_height, ship_height)
+    x = np.asarray(x, dtype=np.int32)
+    y = np.asarray(y, dtype=np.int32)
+    if not len(x):
+        # An empty fleet counts as shot down, so the game would go up a
+        # level every tick.
+        raise ValueError("a {}x{} screen has no room for a {} wave".format(
+            screen_width, screen_height, pattern))
+    # Every fleet that spawns this formation shares these arrays.
+    x.setflags(write=False)
+    y.setflags(write=False)
+    return x, y
+
+def pattern_for_level(ai_settings, level):
+    """Return the name of the pattern the fleet uses on level."""
+    patterns = ai_settings.wave_patterns
+    return patterns[(level - 1) % len(patterns)]
+
+def smallest_screen(alien_width, alien_height, ship_height):
+    """Return the smallest width and height that fit one alien in a grid."""
+    return 4 * alien_width, 5 * alien_height + ship_height
+
+def empty_patterns(alien_width, alien_height, ship_height, widths=40):
+    """
+    Return (pattern, width) for every pattern that has no aliens at the
+    smallest height and one of the widths widths alien widths up from the
+    smallest width.
+    """
+    width, height = smallest_screen(alien_width, alien_height, ship_height)
+    empty = []
+    for screen_width in range(width, width + widths * alien_width):
+        for name, pattern in PATTERNS.items():
+            x, y = pattern(screen_width, height, alien_width, alien_height,
+                           ship_height)
+            if not len(x):
+                empty.append((name, screen_width))
+    return empty
+
+def main():
+    """Check every pattern has aliens on every screen big enough for one."""
+    ai_settings = Settings()
+    alien_image = pygame.image.load('images/alien.bmp')
+    alien_width, alien_height = alien_image.get_size()
+    alien_width = max(1, round(alien_width * ai_settings.alien_scale))
+    alien_height = max(1, round(alien_height * ai_settings.alien_scale))
+    ship_height = pygame.image.load('images/ship.bmp').get_height()
+    empty = empty_patterns(alien_width, alien_height, ship_height)
+    for name, screen_width in empty:
+        print("{} has no aliens {} pixels wide".format(name, screen_width))
+    if empty:
+        sys.exit(1)
+    print("Every pattern has aliens from {}x{} up.".format(
+        *smallest_screen(alien_width, alien_height, ship_height)))
+
+if __name__ == '__main__':
+    main()
+
+# A wave pattern is a function from the screen, alien and ship sizes to the
+# position of every alien in the formation. Each one works out the whole
+# layout at once with NumPy instead of placing aliens one at a time, and
+# formation() remembers each layout, so after the first wave of a kind,
+# spawning it again starts with a dictionary lookup.
+
+# wave_patterns in settings.py picks which patterns to use, one after the
+# other as the levels go up. Set alien_scale there too to shrink the
+# aliens; a swarm of quarter-size aliens fills a 1200x800 screen with over
+# two thousand of them.
+
+# A screen narrower or shorter than smallest_screen() has no room for even
+# one alien, and formation() refuses to make an empty fleet, since the game
+# would count it as shot down and go up a level every tick. Above that
+# size every pattern has to leave some aliens in; twin() just stays a plain
+# grid until there are enough columns to take a third out. Run
+#   python waves.py
+# to check every pattern against a range of widths.